@@ -0,0 +1,244 @@
+"""
+Open-loop load generator for the running service (src/main.py).
+
+Requests are started at a constant arrival rate whatever the service does:
+request i is due at start + i / rate, and its latency is measured from that
+due time, not from when it was actually sent. A slow service therefore shows
+up as latency (time queued behind the schedule, the connection pool or the
+server) instead of silently lowering the request rate: no coordinated
+omission. Latencies go to HDR histograms (1 us to 60 s, 3 significant
+digits), per request and overall.
+
+Each request carries a W3C traceparent with a fresh trace id, marked
+sampled. The service follows the caller's decision (ParentBased) and traces
+every request, so the slowest requests are listed with trace ids to look up
+in the tracing backend. --unsampled marks them not sampled instead: the
+service records no trace, which takes tracing out of the latencies, and the
+slowest requests are listed without trace ids.
+
+    python benchmarks/loadgen.py [--base-url http://localhost:8080] [--rate 100]
+        [--duration 30] [--connections 100] [--timeout 10] [--scenario FILE]
+        [--unsampled] [--json FILE]
+
+A scenario is a weighted mix of requests (JSON, default below). In paths and
+bodies, {n} is a unique number per request and {team_id} a random team id
+(teams are listed, or created, before the run):
+
+    {"requests": [
+        {"name": "create_user", "method": "POST", "path": "/users", "weight": 1,
+         "json": {"name": "load{n}", "email": "load{n}@example.com"}},
+        {"name": "list_users", "method": "GET", "path": "/users?limit=20", "weight": 3},
+        {"name": "read_team", "method": "GET", "path": "/teams/{team_id}", "weight": 2}
+    ]}
+"""
+import sys
+import json
+import random
+import asyncio
+import argparse
+from itertools import count
+from secrets import token_hex
+from collections import Counter
+
+import httpx
+from hdrh.histogram import HdrHistogram
+
+DEFAULT_SCENARIO = {
+    "requests": [
+        {
+            "name": "create_user", "method": "POST", "path": "/users", "weight": 1,
+            "json": {"name": "load{n}", "email": "load{n}@example.com"},
+        },
+        {"name": "list_users", "method": "GET", "path": "/users?limit=20", "weight": 3},
+        {"name": "read_team", "method": "GET", "path": "/teams/{team_id}", "weight": 2},
+    ]
+}
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def histogram() -> HdrHistogram:
+    return HdrHistogram(1, 60_000_000, 3)
+
+
+def fill(template, values: dict):
+    # Placeholders in strings, recursively in JSON bodies
+    if isinstance(template, str):
+        return template.format(**values)
+    if isinstance(template, dict):
+        return {key: fill(value, values) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill(value, values) for value in template]
+    return template
+
+
+class Stats:
+    def __init__(self):
+        self.histogram = histogram()
+        self.sent = 0
+        self.errors: Counter = Counter()
+
+    def summary(self, duration: float) -> dict:
+        return {
+            "requests": self.sent,
+            "throughput": round(self.sent / duration, 1),
+            "errors": dict(self.errors),
+            "error_rate": round(sum(self.errors.values()) / self.sent, 4) if self.sent else 0.0,
+            "latency_ms": {
+                **{f"p{p:g}": self.histogram.get_value_at_percentile(p) / 1000 for p in PERCENTILES},
+                "max": self.histogram.get_max_value() / 1000,
+                "mean": round(self.histogram.get_mean_value() / 1000, 3),
+            },
+        }
+
+
+class LoadGenerator:
+    def __init__(
+        self, client: httpx.AsyncClient, scenario: dict, seed: int | None = None, sampled: bool = True
+    ):
+        self._client = client
+        self._sampled = sampled
+        self._trace_flags = "01" if sampled else "00"
+        self._requests = scenario["requests"]
+        self._weights = [request.get("weight", 1) for request in self._requests]
+        self._random = random.Random(seed)
+        self._numbers = count(1)
+        self.team_ids: list[str] = []
+        self.stats = {request["name"]: Stats() for request in self._requests}
+        self.slowest: list[tuple[float, str, str]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def prepare(self) -> None:
+        if not any("{team_id}" in request["path"] for request in self._requests):
+            return
+        response = await self._client.get("/teams?limit=100")
+        response.raise_for_status()
+        self.team_ids = [team["id"] for team in response.json()]
+        if not self.team_ids:
+            response = await self._client.post("/teams:batch", json={"records": [
+                {"name": f"load-team-{token_hex(4)}"} for _ in range(10)
+            ]})
+            response.raise_for_status()
+            self.team_ids = [result["record_id"] for result in response.json()["results"]]
+
+    async def run(self, rate: float, duration: float) -> float:
+        loop = asyncio.get_running_loop()
+        tasks: set[asyncio.Task] = set()
+        start = loop.time()
+        for index in count():
+            due = start + index / rate
+            if due >= start + duration:
+                break
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            # Behind schedule: send at once, the delay is part of the latency
+            request = self._random.choices(self._requests, self._weights)[0]
+            task = loop.create_task(self._send(request, due))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        return loop.time() - start
+
+    async def _send(self, request: dict, due: float) -> None:
+        loop = asyncio.get_running_loop()
+        values = {"n": next(self._numbers)}
+        if self.team_ids:
+            values["team_id"] = self._random.choice(self.team_ids)
+        trace_id = token_hex(16)
+        stats = self.stats[request["name"]]
+        stats.sent += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            response = await self._client.request(
+                request["method"],
+                fill(request["path"], values),
+                json=fill(request["json"], values) if "json" in request else None,
+                headers={"traceparent": f"00-{trace_id}-{token_hex(8)}-{self._trace_flags}"},
+            )
+            if response.status_code >= 400:
+                stats.errors[str(response.status_code)] += 1
+        except httpx.HTTPError as error:
+            stats.errors[type(error).__name__] += 1
+        finally:
+            self.in_flight -= 1
+            latency = loop.time() - due
+            stats.histogram.record_value(max(int(latency * 1_000_000), 1))
+            self.slowest.append((latency, request["name"], trace_id))
+            if len(self.slowest) > 100:
+                self.slowest = sorted(self.slowest, reverse=True)[:10]
+
+    def report(self, duration: float) -> dict:
+        total = Stats()
+        for stats in self.stats.values():
+            total.histogram.add(stats.histogram)
+            total.sent += stats.sent
+            total.errors.update(stats.errors)
+        return {
+            "duration_s": round(duration, 3),
+            "max_in_flight": self.max_in_flight,
+            "total": total.summary(duration),
+            "requests": {name: stats.summary(duration) for name, stats in self.stats.items()},
+            # Trace ids of unsampled requests were never recorded by the service
+            "slowest": [
+                {"latency_ms": round(latency * 1000, 3), "request": name}
+                | ({"trace_id": trace_id} if self._sampled else {})
+                for latency, name, trace_id in sorted(self.slowest, reverse=True)[:10]
+            ],
+        }
+
+
+def print_report(report: dict, rate: float) -> None:
+    print(f"target {rate:g} req/s for {report['duration_s']:g} s, max in flight {report['max_in_flight']}")
+    header = "".join(f"{f'p{p:g}':>10}" for p in PERCENTILES)
+    print(f"{'request':>14} {'count':>7} {'req/s':>8} {'errors':>7}{header}{'max':>10}  (ms)")
+    for name, summary in [*report["requests"].items(), ("total", report["total"])]:
+        latency = summary["latency_ms"]
+        print(
+            f"{name:>14} {summary['requests']:>7} {summary['throughput']:>8.1f} "
+            f"{summary['error_rate']:>7.2%}"
+            + "".join(f"{latency[f'p{p:g}']:>10.2f}" for p in PERCENTILES)
+            + f"{latency['max']:>10.2f}"
+        )
+    if report["total"]["errors"]:
+        print(f"errors: {report['total']['errors']}")
+    print("slowest (trace ids):" if report["slowest"] and "trace_id" in report["slowest"][0] else "slowest:")
+    for slow in report["slowest"][:5]:
+        print(f"  {slow['latency_ms']:>10.2f} ms  {slow['request']:<14} {slow.get('trace_id', '')}".rstrip())
+
+
+async def main(args: argparse.Namespace) -> int:
+    scenario = DEFAULT_SCENARIO
+    if args.scenario:
+        with open(args.scenario) as scenario_file:
+            scenario = json.load(scenario_file)
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        generator = LoadGenerator(client, scenario, seed=args.seed, sampled=not args.unsampled)
+        await generator.prepare()
+        duration = await generator.run(args.rate, args.duration)
+    report = generator.report(duration)
+    print_report(report, args.rate)
+    if args.json:
+        with open(args.json, "w") as report_file:
+            json.dump(report, report_file, indent=2)
+            report_file.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:8080")
+    parser.add_argument("--rate", type=float, default=100.0, help="requests started per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--connections", type=int, default=100, help="connection pool size")
+    parser.add_argument("--timeout", type=float, default=10.0, help="seconds per request")
+    parser.add_argument("--scenario", default=None, help="JSON scenario file")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the request mix")
+    parser.add_argument(
+        "--unsampled", action="store_true",
+        help="mark every trace not sampled (the service traces none, no trace ids in the report)"
+    )
+    parser.add_argument("--json", default=None, help="also write the report to this file")
+    sys.exit(asyncio.run(main(parser.parse_args())))
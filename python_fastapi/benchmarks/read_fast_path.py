@@ -0,0 +1,94 @@
+"""
+Requests per second of GET /users and GET /users/{id} through the ASGI app:
+"validated" is the previous route body (rows returned to FastAPI, validated
+into ReadUserResponse, then serialized), "fast" the current route (rows
+encoded straight to JSON bytes with orjson).
+
+    python benchmarks/read_fast_path.py [requests] [users]
+"""
+import sys
+import asyncio
+from os import path, remove
+from time import perf_counter
+
+sys.path.append(f"{path.dirname(path.dirname(path.abspath(__file__)))}/src")
+
+from config.settings import settings
+
+settings.ENVIRONMENT = "test"
+
+from httpx import AsyncClient, ASGITransport
+from fastapi import FastAPI, status
+from fastapi.responses import ORJSONResponse
+from uuid import UUID
+
+from adapter.rest.di import PublicCrudDep, PaginationDep, UnitOfWorkDep
+from adapter.rest.dto import ReadUserResponse, projected_columns
+from adapter.rest.routes import crud_routes
+from config.container import container
+
+
+def validated_app() -> FastAPI:
+    # The user read routes as they were before the fast path
+    app = FastAPI(default_response_class=ORJSONResponse, dependencies=[UnitOfWorkDep])
+
+    @app.get("/users/{record_id}", response_model=ReadUserResponse, status_code=status.HTTP_200_OK)
+    async def read_user_by_id(record_id: UUID, data_manager: PublicCrudDep):
+        return await data_manager.process(
+            operation="read", entity="users", record_id=record_id,
+            columns=projected_columns(ReadUserResponse)
+        )
+
+    @app.get("/users", response_model=list[ReadUserResponse], status_code=status.HTTP_200_OK)
+    async def read_all_users(data_manager: PublicCrudDep, pagination: PaginationDep):
+        return await data_manager.process(
+            operation="read", entity="users", offset=pagination.offset, limit=pagination.limit,
+            order=pagination.order, after=pagination.after,
+            columns=projected_columns(ReadUserResponse)
+        )
+
+    return app
+
+
+def fast_app() -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(crud_routes)
+    return app
+
+
+async def measure(app: FastAPI, url: str, requests: int) -> float:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(20):
+            await client.get(url)  # warm up
+        started = perf_counter()
+        for _ in range(requests):
+            response = await client.get(url)
+            assert response.status_code == 200
+        return requests / (perf_counter() - started)
+
+
+async def main(requests: int, users: int) -> None:
+    container.initialize()
+    await container.db_manager().init_db()
+    try:
+        data_manager = container.data_manager()
+        await data_manager.process(
+            operation="batch_create", entity="users",
+            records=[{"name": f"user{i}", "email": f"user{i}@example.com", "location": "Lisbon"} for i in range(users)]
+        )
+        user_id = (await data_manager.process(operation="read", entity="users", limit=1))[0].id
+
+        for name, url in (("GET /users", "/users?limit=100"), ("GET /users/{id}", f"/users/{user_id}")):
+            validated = await measure(validated_app(), url, requests)
+            fast = await measure(fast_app(), url, requests)
+            print(f"{name:>15}: validated {validated:7.0f} req/s | fast {fast:7.0f} req/s | x{fast / validated:.2f}")
+    finally:
+        await container.db_manager().close_session()
+        if path.exists("test.db"):
+            remove("test.db")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    defaults = [1000, 100]
+    asyncio.run(main(*(args + defaults[len(args):])))
@@ -0,0 +1,80 @@
+"""
+Concurrent request throughput on SQLite with the default engine (rollback
+journal, one pool for everything) and the tuned profile (WAL, mmap, a single
+writer connection and a read pool). Each simulated request runs in a unit of
+work like an HTTP request does: a few reads, then a write every
+``write_every`` requests.
+
+    python benchmarks/sqlite_profile.py [requests] [concurrency] [write_every]
+"""
+import sys
+import asyncio
+from os import path, remove
+from time import perf_counter
+
+sys.path.append(f"{path.dirname(path.dirname(path.abspath(__file__)))}/src")
+
+from config.settings import settings
+
+settings.ENVIRONMENT = "test"
+settings.TEST_SQLITE_URL = "sqlite+aiosqlite:///bench_sqlite.db"
+
+from adapter.sql.data_access import DbAccessImpl
+from adapter.sql.data_base import DatabaseManager
+
+
+async def request(db_access: DbAccessImpl, index: int, write_every: int, team_ids: list) -> None:
+    async with db_access.unit_of_work():
+        await db_access.read_record(table_id="teams", record_id=team_ids[index % len(team_ids)])
+        await db_access.read_record(table_id="users", limit=20, order="asc")
+        if index % write_every == 0:
+            await db_access.create_record(
+                table_id="users",
+                attributes={"name": f"user{index}", "email": f"user{index}@example.com"},
+            )
+
+
+async def run(tuned: bool, requests: int, concurrency: int, write_every: int) -> None:
+    settings.SQLITE_TUNED_PROFILE = tuned
+    DatabaseManager.reset_engine()
+    await DatabaseManager.init_db()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    try:
+        teams = await db_access.create_records(table_id="teams", rows=[{"name": f"team{i}"} for i in range(50)])
+        team_ids = [team.id for team in teams]
+        semaphore = asyncio.Semaphore(concurrency)
+        errors: dict[str, int] = {}
+
+        async def bounded(index: int) -> None:
+            async with semaphore:
+                try:
+                    await request(db_access, index, write_every, team_ids)
+                except Exception as error:
+                    kind = "database is locked" if "locked" in str(error) else type(error).__name__
+                    errors[kind] = errors.get(kind, 0) + 1
+
+        started = perf_counter()
+        await asyncio.gather(*(bounded(index) for index in range(requests)))
+        elapsed = perf_counter() - started
+        failed = sum(errors.values())
+        print(
+            f"{'tuned' if tuned else 'default':>8}: {requests / elapsed:8.0f} req/s | "
+            f"{elapsed:6.2f} s | failed {failed} {errors or ''}"
+        )
+    finally:
+        await DatabaseManager.close_session()
+        for suffix in ("", "-wal", "-shm"):
+            if path.exists(f"bench_sqlite.db{suffix}"):
+                remove(f"bench_sqlite.db{suffix}")
+
+
+async def main(requests: int, concurrency: int, write_every: int) -> None:
+    print(f"{requests} requests, {concurrency} concurrent, 1 write every {write_every} requests")
+    for tuned in (False, True):
+        await run(tuned, requests, concurrency, write_every)
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    defaults = [2000, 50, 4]
+    asyncio.run(main(*(args + defaults[len(args):])))
@@ -0,0 +1,111 @@
+"""
+Cold start of the service, checked against the budget in startup_budget.json:
+
+- import: cumulative ``-X importtime`` of ``adapter.rest.server`` (what the
+  supervisor and every new worker pay before serving), with the heaviest
+  modules it pulls in;
+- first_health: from starting ``src/main.py`` (``workers`` processes) to
+  the first successful GET /health.
+
+Fastest of ``runs``: noise on a shared machine only adds time, so the
+minimum tracks the startup work itself and allows a tight budget. Exits with
+1 when over budget; ``--record`` writes the current values plus 10% headroom
+as the new budget. Telemetry follows the environment (.env): an empty
+OTEL_EXPORTER_OTLP_ENDPOINT skips the SDK and the exporters.
+
+    python benchmarks/startup.py [runs] [workers] [--record]
+"""
+import sys
+import json
+import signal
+import subprocess
+from os import environ, killpg, path, remove
+from time import perf_counter, sleep
+
+import httpx
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+BUDGET = f"{ROOT}/benchmarks/startup_budget.json"
+PORT = 18282
+DB = f"{ROOT}/bench_startup.db"
+
+
+def import_time() -> tuple[float, list[tuple[float, str]]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import adapter.rest.server"],
+        cwd=f"{ROOT}/src", capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.append((int(cumulative) / 1000, name.rstrip()))
+    total = next(ms for ms, name in modules if name.strip() == "adapter.rest.server")
+    # Top-level packages only (least indented names)
+    top = [(ms, name.strip()) for ms, name in modules if name.startswith("   ") and not name.startswith("    ")]
+    return total, sorted(top, reverse=True)[:8]
+
+
+def first_health(client: httpx.Client, workers: int) -> float:
+    env = {
+        **environ,
+        "ENVIRONMENT": "development",
+        "DEV_SQLITE_URL": f"sqlite+aiosqlite:///{DB}",
+        "WEB_WORKERS": str(workers),
+        "WEB_HOST": "127.0.0.1",
+        "WEB_PORT": str(PORT),
+    }
+    started = perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, f"{ROOT}/src/main.py"], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        while perf_counter() - started < 30:
+            try:
+                if client.get(f"http://127.0.0.1:{PORT}/health").status_code == 200:
+                    return (perf_counter() - started) * 1000
+            except httpx.TransportError:
+                sleep(0.01)
+        raise RuntimeError("server did not start")
+    finally:
+        # Startup is measured, not shutdown (flushing telemetry can take a while):
+        # kill the supervisor and its workers at once
+        killpg(server.pid, signal.SIGKILL)
+        server.wait()
+        for suffix in ("", "-wal", "-shm"):
+            if path.exists(f"{DB}{suffix}"):
+                remove(f"{DB}{suffix}")
+
+
+def main(runs: int, workers: int, record: bool) -> int:
+    imports = [import_time() for _ in range(runs)]
+    with httpx.Client() as client:
+        results = {
+            "import_ms": min(total for total, _ in imports),
+            "first_health_ms": min(first_health(client, workers) for _ in range(runs)),
+        }
+    print("import adapter.rest.server, heaviest modules (last run):")
+    for ms, name in imports[-1][1]:
+        print(f"  {ms:8.1f} ms  {name}")
+
+    if record:
+        with open(BUDGET, "w") as budget_file:
+            json.dump({key: round(value * 1.1) for key, value in results.items()}, budget_file, indent=2)
+            budget_file.write("\n")
+    with open(BUDGET) as budget_file:
+        budget = json.load(budget_file)
+
+    over = False
+    for key, value in results.items():
+        status = "ok" if value <= budget[key] else "OVER BUDGET"
+        over = over or value > budget[key]
+        print(f"{key:>16}: {value:8.1f} ms (budget {budget[key]} ms) {status}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:] if arg != "--record"]
+    defaults = [5, 1]
+    sys.exit(main(*(args + defaults[len(args):]), record="--record" in sys.argv))
@@ -0,0 +1,68 @@
+"""
+Per-query Python overhead of repository reads with and without the statement
+registry. "rebuild" clears the registry before every call, which is what each
+call paid before (construct built from scratch, cache key generated from a
+new object graph); "registry" reuses the prepared statement.
+
+    python benchmarks/statement_cache.py [iterations]
+"""
+import sys
+import asyncio
+from os import path, remove
+from time import perf_counter
+
+sys.path.append(f"{path.dirname(path.dirname(path.abspath(__file__)))}/src")
+
+from config.settings import settings
+
+settings.ENVIRONMENT = "test"
+
+from adapter.sql.data_access import DbAccessImpl
+from adapter.sql.data_base import DatabaseManager
+from adapter.sql.statements import statements
+
+
+def build_only(db_access: DbAccessImpl, iterations: int, reuse: bool) -> float:
+    # Statement lookup + SQLAlchemy cache key: the Python work before any I/O
+    key = ("read", "teams", "id", None, False, None, None)
+    started = perf_counter()
+    for _ in range(iterations):
+        if not reuse:
+            statements.clear()
+        statement = statements.get(key, lambda: db_access._read_statement("teams", "id", None, False, None))
+        statement._generate_cache_key()
+    return (perf_counter() - started) / iterations
+
+
+async def read_calls(db_access: DbAccessImpl, team, iterations: int, reuse: bool) -> float:
+    started = perf_counter()
+    for _ in range(iterations):
+        if not reuse:
+            statements.clear()
+        await db_access.read_record(table_id="teams", record_id=team.id)
+        await db_access.read_record(table_id="teams", limit=10, order="asc")
+    return (perf_counter() - started) / (iterations * 2)
+
+
+async def main(iterations: int) -> None:
+    await DatabaseManager.init_db()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    try:
+        await db_access.create_records(table_id="teams", rows=[{"name": f"team{i}"} for i in range(10)])
+        team = (await db_access.read_record(table_id="teams", limit=1, order="asc"))[0]
+        await read_calls(db_access, team, 50, reuse=True)  # warm up pools and compiled cache
+
+        for name, reuse in (("rebuild", False), ("registry", True)):
+            build = build_only(db_access, iterations, reuse)
+            statements.clear()
+            call = await read_calls(db_access, team, iterations, reuse)
+            print(f"{name:>8}: build+cache key {build * 1e6:8.1f} us | read_record {call * 1e6:8.1f} us")
+        print(f"registry stats: {statements.stats()}")
+    finally:
+        await DatabaseManager.close_session()
+        if path.exists("test.db"):
+            remove("test.db")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
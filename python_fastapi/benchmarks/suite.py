@@ -0,0 +1,331 @@
+"""
+Benchmark suite for the CRUD hot paths, layer by layer:
+
+- manager:  DataManagerImpl.process alone, over an in-memory repository
+- sqlite:   DbAccessImpl on SQLite (TEST_SQLITE_URL, a scratch file)
+- postgres: DbAccessImpl on PostgreSQL (--postgres-url, a scratch database:
+            the model tables are created and dropped)
+- routes:   the CRUD routes through httpx's ASGITransport, on SQLite
+
+Operations: create (a user), read (a user by id), list (20 users) and
+team_members (a team with its first 100 members), each at several dataset
+sizes (users; one team per 50 users). Every result has p50/p95/p99 latency,
+ops/sec and the peak bytes allocated while one operation runs (tracemalloc,
+measured in a separate pass so it does not skew the timings).
+
+    python benchmarks/suite.py run [--layers manager,sqlite,routes] [--sizes 100,1000]
+                                   [--iterations 500] [--postgres-url URL] [--output FILE]
+    python benchmarks/suite.py compare BASELINE CURRENT [--threshold 0.10]
+
+compare exits with 1 when an operation got slower (p50 or p95), lost
+throughput or allocates more by more than the threshold.
+"""
+import sys
+import gc
+import json
+import asyncio
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from os import makedirs, path, remove
+from time import perf_counter_ns, strftime
+from types import SimpleNamespace
+from itertools import islice
+from contextlib import asynccontextmanager
+from statistics import quantiles
+from uuid import uuid4
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.append(f"{ROOT}/src")
+
+from config.settings import settings
+
+settings.ENVIRONMENT = "test"
+settings.TEST_SQLITE_URL = "sqlite+aiosqlite:///bench_suite.db"
+
+from httpx import AsyncClient, ASGITransport
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+
+from adapter.sql.data_access import DbAccessImpl
+from adapter.sql.data_base import DatabaseManager
+from core.data_manager.use_cases import DataManagerImpl
+
+LAYERS = ("manager", "sqlite", "postgres", "routes")
+MEMBERS_PER_TEAM = 50
+
+
+class MemoryRepository:
+    """The DbAccess calls DataManagerImpl.process makes, over dicts: no I/O."""
+
+    def __init__(self):
+        self.rows: dict[str, dict] = {"users": {}, "teams": {}}
+        self.names: dict[tuple[str, str], object] = {}
+
+    @asynccontextmanager
+    async def unit_of_work(self):
+        # Nothing to commit: writes apply at once
+        yield
+
+    async def create_record(self, table_id: str, attributes: dict):
+        record = SimpleNamespace(id=uuid4(), users=[], **attributes)
+        self.rows[table_id][record.id] = record
+        self.names[(table_id, record.name)] = record
+        if table_id == "users" and attributes.get("team_id") in self.rows["teams"]:
+            self.rows["teams"][attributes["team_id"]].users.append(record)
+        return record
+
+    async def create_records(self, table_id: str, rows: list[dict]):
+        return [await self.create_record(table_id, attributes) for attributes in rows]
+
+    async def lookup_record(self, table_id: str, field: str, value):
+        return self.names.get((table_id, value))
+
+    async def read_record(self, table_id: str, record_id=None, limit=None, relations=None, **kwargs):
+        if record_id is not None:
+            record = self.rows[table_id].get(record_id)
+            if record is not None and relations:
+                record.users_page = record.users[:relations.get("users") or None]
+            return record
+        return list(islice(self.rows[table_id].values(), limit))
+
+
+class Target:
+    """One layer under test: seeding and the four operations."""
+
+    def __init__(self, layer: str):
+        self.layer = layer
+        self.counter = 0
+        self.user_ids: list = []
+        self.team_ids: list = []
+
+    def new_user(self) -> dict:
+        self.counter += 1
+        return {"name": f"bench{self.counter}", "email": f"bench{self.counter}@example.com"}
+
+    async def setup(self, size: int, postgres_url: str | None) -> None:
+        if self.layer == "manager":
+            self.repository = MemoryRepository()
+            self.data_manager = DataManagerImpl(repository=self.repository)
+        else:
+            if self.layer == "postgres":
+                settings.ENVIRONMENT = "production"
+                settings.PSQL_DATABASE_URL = postgres_url
+            DatabaseManager.reset_engine()
+            await DatabaseManager.init_db()
+            if self.layer == "postgres":
+                await DatabaseManager.migrate()
+            self.repository = DbAccessImpl(db_manager=DatabaseManager)
+            if self.layer == "routes":
+                from config.container import container
+                from adapter.rest.routes import create_routes, crud_routes
+                container.reset()
+                container.initialize()
+                app = FastAPI(default_response_class=ORJSONResponse)
+                app.include_router(create_routes)
+                app.include_router(crud_routes)
+                self.client = AsyncClient(transport=ASGITransport(app=app), base_url="http://bench")
+
+        teams = await self.repository.create_records(
+            "teams", [{"name": f"team{i}"} for i in range(max(size // MEMBERS_PER_TEAM, 1))]
+        )
+        self.team_ids = [team.id for team in teams]
+        users = await self.repository.create_records("users", [
+            {**self.new_user(), "team_id": self.team_ids[i % len(self.team_ids)]} for i in range(size)
+        ])
+        self.user_ids = [user.id for user in users]
+        self.team_name = teams[0].name
+
+    async def teardown(self) -> None:
+        if self.layer == "manager":
+            return
+        if self.layer == "routes":
+            await self.client.aclose()
+        if self.layer == "postgres":
+            from sqlmodel import SQLModel
+            async with DatabaseManager.get_engine().begin() as conn:
+                await conn.run_sync(SQLModel.metadata.drop_all)
+            settings.ENVIRONMENT = "test"
+        await DatabaseManager.close_session()
+        for suffix in ("", "-wal", "-shm"):
+            if path.exists(f"bench_suite.db{suffix}"):
+                remove(f"bench_suite.db{suffix}")
+
+    def operation(self, name: str):
+        user_id = self.user_ids[len(self.user_ids) // 2]
+        team_id = self.team_ids[0]
+        if self.layer == "manager":
+            process = self.data_manager.process
+            return {
+                "create": lambda: process(operation="create", entity="users", team_name=self.team_name, **self.new_user()),
+                "read": lambda: process(operation="read", entity="users", record_id=user_id),
+                "list": lambda: process(operation="read", entity="users", limit=20),
+                "team_members": lambda: process(
+                    operation="read", entity="teams", record_id=team_id, relations={"users": 100}
+                ),
+            }[name]
+        if self.layer == "routes":
+            client = self.client
+
+            async def request(method: str, url: str, **kwargs):
+                response = await client.request(method, url, **kwargs)
+                assert response.status_code < 300, response.text
+
+            return {
+                "create": lambda: request("POST", "/users", json={**self.new_user(), "team_name": self.team_name}),
+                "read": lambda: request("GET", f"/users/{user_id}"),
+                "list": lambda: request("GET", "/users?limit=20"),
+                "team_members": lambda: request("GET", f"/teams/{team_id}?expand=members&members_limit=100"),
+            }[name]
+        db = self.repository
+        return {
+            "create": lambda: db.create_record("users", {**self.new_user(), "team_id": team_id}),
+            "read": lambda: db.read_record("users", record_id=user_id),
+            "list": lambda: db.read_record("users", limit=20, order="asc"),
+            "team_members": lambda: db.read_record("teams", record_id=team_id, relations={"users": 100}),
+        }[name]
+
+
+async def measure(call, iterations: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await call()
+    gc.collect()
+    samples = []
+    started = perf_counter_ns()
+    for _ in range(iterations):
+        before = perf_counter_ns()
+        await call()
+        samples.append(perf_counter_ns() - before)
+    elapsed = perf_counter_ns() - started
+
+    # Separate pass: tracemalloc slows every allocation down
+    allocations = []
+    tracemalloc.start()
+    for _ in range(min(iterations, 50)):
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        await call()
+        allocations.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+
+    cuts = quantiles(samples, n=100)
+    return {
+        "iterations": iterations,
+        "ops_per_sec": round(iterations / (elapsed / 1e9), 1),
+        "p50_us": round(cuts[49] / 1000, 1),
+        "p95_us": round(cuts[94] / 1000, 1),
+        "p99_us": round(cuts[98] / 1000, 1),
+        "peak_alloc_bytes": sorted(allocations)[len(allocations) // 2],
+    }
+
+
+async def run(layers: list[str], sizes: list[int], iterations: int, postgres_url: str | None) -> list[dict]:
+    results = []
+    for layer in layers:
+        if layer == "postgres" and not postgres_url:
+            print("postgres: skipped (no --postgres-url)")
+            continue
+        for size in sizes:
+            target = Target(layer)
+            await target.setup(size, postgres_url)
+            try:
+                for name in ("create", "read", "list", "team_members"):
+                    result = {"layer": layer, "op": name, "size": size, **await measure(
+                        target.operation(name), iterations, warmup=max(iterations // 10, 5)
+                    )}
+                    results.append(result)
+                    print(
+                        f"{layer:>8} {name:>12} {size:>7}: {result['ops_per_sec']:>9.0f} ops/s | "
+                        f"p50 {result['p50_us']:>8.1f} | p95 {result['p95_us']:>8.1f} | "
+                        f"p99 {result['p99_us']:>8.1f} us | {result['peak_alloc_bytes']:>8} B"
+                    )
+            finally:
+                await target.teardown()
+    return results
+
+
+def metadata(iterations: int) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    import sqlalchemy, fastapi
+    return {
+        "created": strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlalchemy": sqlalchemy.__version__,
+        "fastapi": fastapi.__version__,
+        "iterations": iterations,
+    }
+
+
+def compare(baseline_path: str, current_path: str, threshold: float) -> int:
+    with open(baseline_path) as baseline_file, open(current_path) as current_file:
+        baseline = {(r["layer"], r["op"], r["size"]): r for r in json.load(baseline_file)["results"]}
+        current = {(r["layer"], r["op"], r["size"]): r for r in json.load(current_file)["results"]}
+
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key], current[key]
+        # (metric, ratio > 1 means worse)
+        changes = [
+            ("p50", after["p50_us"] / before["p50_us"]),
+            ("p95", after["p95_us"] / before["p95_us"]),
+            ("ops/s", before["ops_per_sec"] / after["ops_per_sec"]),
+            ("alloc", after["peak_alloc_bytes"] / max(before["peak_alloc_bytes"], 1)),
+        ]
+        worse = [f"{metric} {ratio - 1:+.0%}" for metric, ratio in changes if ratio > 1 + threshold]
+        regressions += bool(worse)
+        print(
+            f"{'REGRESSION' if worse else 'ok':>10} {key[0]:>8} {key[1]:>12} {key[2]:>7}: "
+            f"p50 {before['p50_us']:.1f} -> {after['p50_us']:.1f} us | "
+            f"{before['ops_per_sec']:.0f} -> {after['ops_per_sec']:.0f} ops/s"
+            + (f" | {', '.join(worse)}" if worse else "")
+        )
+    for key in sorted(baseline.keys() ^ current.keys()):
+        print(f"{'missing':>10} {' '.join(map(str, key))} (only in {'baseline' if key in baseline else 'current'})")
+    print(f"{regressions} regression(s) over {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--layers", default="manager,sqlite,routes")
+    run_parser.add_argument("--sizes", default="100,1000")
+    run_parser.add_argument("--iterations", type=int, default=500)
+    run_parser.add_argument("--postgres-url", default=None)
+    run_parser.add_argument("--output", default=None)
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        return compare(args.baseline, args.current, args.threshold)
+
+    layers = args.layers.split(",")
+    unknown = set(layers) - set(LAYERS)
+    if unknown:
+        parser.error(f"unknown layers {sorted(unknown)}, choose from {LAYERS}")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = asyncio.run(run(layers, sizes, args.iterations, args.postgres_url))
+    meta = metadata(args.iterations)
+    output = args.output or f"{ROOT}/benchmarks/results/{meta['commit'] or 'local'}-{strftime('%Y%m%d%H%M%S')}.json"
+    makedirs(path.dirname(path.abspath(output)), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump({"meta": meta, "results": results}, output_file, indent=2)
+        output_file.write("\n")
+    print(f"saved {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
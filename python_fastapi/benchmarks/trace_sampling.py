@@ -0,0 +1,130 @@
+"""
+Per-request cost of tracing at several sampling ratios: GET /users?limit=20
+through httpx's ASGITransport on SQLite, with the CRUD routes uninstrumented
+("off") and instrumented with the TRACE_SAMPLE_* sampler. Spans go through
+the BatchSpanProcessor to an exporter that drops them: the network and the
+collector are not part of the numbers.
+
+"0, no errors" is ratio 0 without TRACE_SAMPLE_ERRORS: nothing recorded.
+The ratio is changed between passes by assigning the settings, as
+reload_trace_sampling does. Passes are interleaved over ``rounds``; the
+median per request is reported, and its difference with "off".
+
+    python benchmarks/trace_sampling.py [requests_per_pass] [rounds] [ratios]
+
+ratios defaults to 0,0.01,0.1,1.
+"""
+import sys
+import asyncio
+from os import path, remove
+from time import perf_counter_ns
+from statistics import median
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+sys.path.append(f"{ROOT}/src")
+
+from config.settings import settings
+
+settings.ENVIRONMENT = "test"
+settings.TEST_SQLITE_URL = "sqlite+aiosqlite:///bench_sampling.db"
+
+from httpx import AsyncClient, ASGITransport
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+from config.container import container
+from config.sampling import ErrorSpanProcessor, build_sampler
+from adapter.sql.data_base import DatabaseManager
+from adapter.rest.routes import crud_routes
+
+
+class DroppingExporter(SpanExporter):
+    def __init__(self):
+        self.spans = 0
+
+    def export(self, spans) -> SpanExportResult:
+        self.spans += len(spans)
+        return SpanExportResult.SUCCESS
+
+
+def make_app() -> FastAPI:
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(crud_routes)
+    return app
+
+
+async def run_pass(client: AsyncClient, requests: int) -> float:
+    started = perf_counter_ns()
+    for _ in range(requests):
+        response = await client.get("/users?limit=20")
+        assert response.status_code == 200, response.text
+    return (perf_counter_ns() - started) / requests / 1000
+
+
+async def main(requests: int, rounds: int, ratios: list[float]) -> None:
+    DatabaseManager.reset_engine()
+    await DatabaseManager.init_db()
+    container.reset()
+    container.initialize()
+    await container.db_access().create_records("users", [
+        {"name": f"user{i}", "email": f"user{i}@example.com"} for i in range(100)
+    ])
+
+    config = settings.model_copy()
+    config.TRACE_SAMPLE_RULES = ""
+    exporter = DroppingExporter()
+    provider = TracerProvider(sampler=build_sampler(config))
+    processor = BatchSpanProcessor(exporter)
+    provider.add_span_processor(processor)
+    provider.add_span_processor(ErrorSpanProcessor(processor))
+    traced = make_app()
+    FastAPIInstrumentor.instrument_app(traced, tracer_provider=provider)
+
+    clients = {
+        "off": AsyncClient(transport=ASGITransport(app=make_app()), base_url="http://bench"),
+        "traced": AsyncClient(transport=ASGITransport(app=traced), base_url="http://bench"),
+    }
+    # (ratio, TRACE_SAMPLE_ERRORS): unsampled requests are still recorded, in case they fail
+    configurations = [(0.0, False), *((ratio, True) for ratio in ratios)]
+    labels = ["off", "0, no errors", *(f"ratio {ratio:g}" for ratio in ratios)]
+    samples = {label: [] for label in labels}
+    spans = {label: 0 for label in labels}
+    try:
+        for client in clients.values():
+            await run_pass(client, requests)  # warm up
+        for _ in range(rounds):
+            samples["off"].append(await run_pass(clients["off"], requests))
+            for (ratio, errors), label in zip(configurations, labels[1:]):
+                config.TRACE_SAMPLE_RATIO = ratio
+                config.TRACE_SAMPLE_ERRORS = errors
+                provider.force_flush()
+                exported = exporter.spans
+                samples[label].append(await run_pass(clients["traced"], requests))
+                provider.force_flush()
+                spans[label] += exporter.spans - exported
+    finally:
+        for client in clients.values():
+            await client.aclose()
+        provider.shutdown()
+        await DatabaseManager.close_session()
+        for suffix in ("", "-wal", "-shm"):
+            if path.exists(f"bench_sampling.db{suffix}"):
+                remove(f"bench_sampling.db{suffix}")
+
+    off = median(samples["off"])
+    print(f"GET /users?limit=20, {requests} requests x {rounds} rounds per configuration")
+    print(f"{'':>14} {'us/request':>11} {'overhead':>10} {'spans/request':>14}")
+    for label in labels:
+        value = median(samples[label])
+        print(f"{label:>14} {value:11.0f} {value - off:+9.0f}us {spans[label] / (requests * rounds):14.2f}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    requests = int(args[0]) if len(args) > 0 else 200
+    rounds = int(args[1]) if len(args) > 1 else 5
+    ratios = [float(ratio) for ratio in args[2].split(",")] if len(args) > 2 else [0.0, 0.01, 0.1, 1.0]
+    asyncio.run(main(requests, rounds, ratios))
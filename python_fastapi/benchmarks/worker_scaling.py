@@ -0,0 +1,117 @@
+"""
+Throughput of the real server (src/main.py under uvicorn's supervisor) with
+1 to N worker processes on GET /users?limit=20. The load comes from separate
+client processes so the client is not what saturates first.
+
+    python benchmarks/worker_scaling.py [max_workers] [seconds] [client_processes] [concurrency]
+
+max_workers defaults to the CPU count. Clients run on the same machine:
+scaling flattens past the cores the server actually gets.
+"""
+import sys
+import signal
+import asyncio
+import subprocess
+from os import cpu_count, environ, path, remove
+from time import perf_counter, sleep
+from multiprocessing import Pool
+
+import httpx
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+PORT = 18181
+URL = f"http://127.0.0.1:{PORT}"
+DB = f"{ROOT}/bench_workers.db"
+
+
+def start_server(workers: int) -> subprocess.Popen:
+    env = {
+        **environ,
+        "ENVIRONMENT": "development",
+        "DEV_SQLITE_URL": f"sqlite+aiosqlite:///{DB}",
+        "SQLITE_TUNED_PROFILE": "True",
+        "WEB_WORKERS": str(workers),
+        "WEB_PORT": str(PORT),
+        "WEB_HOST": "127.0.0.1",
+    }
+    server = subprocess.Popen(
+        [sys.executable, f"{ROOT}/src/main.py"], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(300):
+        try:
+            if httpx.get(f"{URL}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        sleep(0.1)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def stop_server(server: subprocess.Popen) -> None:
+    server.send_signal(signal.SIGINT)
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+
+async def drive(seconds: float, concurrency: int) -> int:
+    done = 0
+    deadline = perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=URL, limits=limits) as client:
+        async def worker() -> None:
+            nonlocal done
+            while perf_counter() < deadline:
+                response = await client.get("/users?limit=20")
+                if response.status_code == 200:
+                    done += 1
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done
+
+
+def client_process(args: tuple[float, int]) -> int:
+    return asyncio.run(drive(*args))
+
+
+def measure(workers: int, seconds: float, clients: int, concurrency: int) -> float:
+    server = start_server(workers)
+    try:
+        httpx.post(f"{URL}/users:batch", json={"records": [
+            {"name": f"user{i}", "email": f"user{i}@example.com"} for i in range(100)
+        ]})
+        client_process((1.0, concurrency))  # warm up every worker
+        with Pool(clients) as pool:
+            started = perf_counter()
+            done = sum(pool.map(client_process, [(seconds, concurrency)] * clients))
+            return done / (perf_counter() - started)
+    finally:
+        stop_server(server)
+        for suffix in ("", "-wal", "-shm"):
+            if path.exists(f"{DB}{suffix}"):
+                remove(f"{DB}{suffix}")
+
+
+def main(max_workers: int, seconds: float, clients: int, concurrency: int) -> None:
+    print(f"{cpu_count()} CPUs, {clients} client processes x {concurrency} connections, {seconds:g} s per run")
+    baseline = None
+    workers = 1
+    while True:
+        throughput = measure(workers, seconds, clients, concurrency)
+        baseline = baseline or throughput
+        print(f"{workers:>3} workers: {throughput:8.0f} req/s | x{throughput / baseline:.2f}")
+        if workers >= max_workers:
+            break
+        workers = min(workers * 2, max_workers)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    max_workers = int(args[0]) if len(args) > 0 else cpu_count() or 1
+    seconds = float(args[1]) if len(args) > 1 else 5.0
+    clients = int(args[2]) if len(args) > 2 else 2
+    concurrency = int(args[3]) if len(args) > 3 else 32
+    main(max_workers, seconds, clients, concurrency)
@@ -0,0 +1,70 @@
+"""
+Concurrent single-record creates, outside a unit of work like a POST /users
+request with write coalescing on, with every create committing on its own and
+with write coalescing: throughput, commits and per-create latency (p50/p99).
+
+    python benchmarks/write_coalescing.py [creates] [concurrency] [window_ms]
+"""
+import sys
+import asyncio
+from os import path, remove
+from time import perf_counter
+from statistics import quantiles
+
+sys.path.append(f"{path.dirname(path.dirname(path.abspath(__file__)))}/src")
+
+from config.settings import settings
+
+settings.ENVIRONMENT = "test"
+settings.TEST_SQLITE_URL = "sqlite+aiosqlite:///bench_coalescing.db"
+
+from adapter.sql.data_access import DbAccessImpl
+from adapter.sql.data_base import DatabaseManager
+
+
+async def run(window_seconds: float | None, creates: int, concurrency: int) -> None:
+    DatabaseManager.reset_engine()
+    await DatabaseManager.init_db()
+    db_access = DbAccessImpl(db_manager=DatabaseManager, coalesce_window_seconds=window_seconds)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def create(index: int) -> None:
+        async with semaphore:
+            started = perf_counter()
+            await db_access.create_record(
+                table_id="users",
+                attributes={"name": f"user{index}", "email": f"user{index}@example.com"},
+            )
+            latencies.append(perf_counter() - started)
+
+    try:
+        started = perf_counter()
+        await asyncio.gather(*(create(index) for index in range(creates)))
+        elapsed = perf_counter() - started
+        cuts = quantiles(latencies, n=100)
+        coalescer = db_access._coalescers.get("users")
+        commits = coalescer.stats()["commits"] if coalescer else creates
+        label = "single" if window_seconds is None else f"window {window_seconds * 1000:g}ms"
+        print(
+            f"{label:>14}: {creates / elapsed:7.0f} creates/s | {commits:5d} commits | "
+            f"p50 {cuts[49] * 1000:6.2f} ms | p99 {cuts[98] * 1000:6.2f} ms"
+        )
+    finally:
+        await DatabaseManager.close_session()
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if path.exists(f"bench_coalescing.db{suffix}"):
+                remove(f"bench_coalescing.db{suffix}")
+
+
+async def main(creates: int, concurrency: int, window_ms: float) -> None:
+    print(f"{creates} creates, {concurrency} concurrent")
+    for window_seconds in (None, 0.0, window_ms / 1000):
+        await run(window_seconds, creates, concurrency)
+
+
+if __name__ == "__main__":
+    args = [float(arg) for arg in sys.argv[1:]]
+    defaults = [2000, 200, 2]
+    creates, concurrency, window_ms = args + defaults[len(args):]
+    asyncio.run(main(int(creates), int(concurrency), window_ms))
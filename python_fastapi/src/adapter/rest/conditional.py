@@ -0,0 +1,55 @@
+from hashlib import blake2b
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response, status
+
+
+def record_validators(version, variant: str = "") -> dict[str, str]:
+    """
+    ETag and Last-Modified of a record from its version row (see
+    ``DbAccess.read_version``). ``variant`` tells apart representations of
+    the same record (e.g. which relationships are expanded).
+    """
+    digest = blake2b(f"{tuple(version)!r}|{variant}".encode(), digest_size=16).hexdigest()
+    headers = {"ETag": f'"{digest}"'}
+    changed = [value for value in version if isinstance(value, datetime)]
+    if changed:
+        last_modified = max(
+            value if value.tzinfo else value.replace(tzinfo=timezone.utc) for value in changed
+        )
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def page_validators(body: bytes) -> dict[str, str]:
+    # Weak: equal pages, not a version of any stored record
+    return {"ETag": f'W/"{blake2b(body, digest_size=16).hexdigest()}"'}
+
+
+def not_modified(request: Request, validators: dict[str, str]) -> bool:
+    """
+    Evaluate If-None-Match (weak comparison), or If-Modified-Since when
+    there is no If-None-Match, against the current validators.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        current = validators["ETag"].removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == current for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or "Last-Modified" not in validators:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return parsedate_to_datetime(validators["Last-Modified"]) <= since
+
+
+def not_modified_response(validators: dict[str, str]) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
@@ -1,18 +1,135 @@
-from fastapi import Depends, Query
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from uuid import UUID
+
+import orjson
+from fastapi import Depends, Header, HTTPException, Query, Request, status
 from typing import Annotated
 
 from ports.inbound.data_manager import DataManager
 from config.container import container
-from adapter.rest.dto import QueryPagination
+from adapter.rest.dto import QueryPagination, QueryExpansion, QuerySearch, QueryTotal
+from adapter.rest.idempotency import IdempotentRequest
+
+
+def encode_cursor(name: str, record_id: UUID, order: str) -> str:
+    """Opaque keyset cursor: the (name, id) sort key of the last row and the order."""
+    payload = orjson.dumps([name, str(record_id), order])
+    return urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[tuple[str, UUID], str]:
+    try:
+        payload = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        name, record_id, order = orjson.loads(payload)
+        if not isinstance(name, str) or order not in ("asc", "desc"):
+            raise ValueError(cursor)
+        return (name, UUID(record_id)), order
+    except (ValueError, TypeError) as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor."
+        ) from error
+
+
+def encode_search_cursor(rank: float, record_id: UUID) -> str:
+    """Opaque keyset cursor of a search page: the (rank, id) of its last row."""
+    payload = orjson.dumps([rank, str(record_id)])
+    return urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, UUID]:
+    try:
+        payload = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        rank, record_id = orjson.loads(payload)
+        if not isinstance(rank, (int, float)) or isinstance(rank, bool):
+            raise ValueError(cursor)
+        return float(rank), UUID(record_id)
+    except (ValueError, TypeError) as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid search cursor."
+        ) from error
+
+
+def get_search(
+    q: str = Query(..., min_length=3, max_length=200, description="Text contained in the name, email or location"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor response header")
+) -> QuerySearch:
+    after = decode_search_cursor(cursor) if cursor is not None else None
+    return QuerySearch(q=q, limit=limit, after=after)
 
 
 def get_pagination(
     offset: int | None = Query(None, ge=0),
     limit: int | None = Query(None, ge=1, le=100),
-    order: str = Query("asc", pattern="^(asc|desc)$")
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: str | None = Query(None, description="Opaque cursor from the X-Next-Cursor response header")
 ) -> QueryPagination:
-    return QueryPagination(offset=offset, limit=limit, order=order)
+    if cursor is None:
+        return QueryPagination(offset=offset, limit=limit, order=order)
+    if offset is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'offset' and 'cursor' cannot be combined."
+        )
+    # The cursor carries the order of the page it was issued for
+    after, order = decode_cursor(cursor)
+    return QueryPagination(limit=limit, order=order, after=after)
+
+
+def get_expansion(
+    expand: str = Query(
+        "members",
+        pattern="^(none|count|members)$",
+        description="Team members to include: none, their count only, or the first members_limit members"
+    ),
+    members_limit: int = Query(100, ge=1, le=1000, description="Members returned per team with expand=members")
+) -> QueryExpansion:
+    return QueryExpansion(expand=expand, members_limit=members_limit)
+
+
+def get_total(
+    include_total: bool = Query(False, description="Send the table's row count in X-Total-Count"),
+    total: str = Query(
+        "approximate",
+        pattern="^(approximate|exact)$",
+        description="approximate: planner statistics, no scan; exact: COUNT(*), cached per table"
+    )
+) -> QueryTotal:
+    return QueryTotal(include_total=include_total, exact=total == "exact")
 
 
 PublicCrudDep = Annotated[DataManager, Depends(container.public_crud)]
 PaginationDep = Annotated[QueryPagination, Depends(get_pagination)]
+ExpansionDep = Annotated[QueryExpansion, Depends(get_expansion)]
+SearchDep = Annotated[QuerySearch, Depends(get_search)]
+TotalDep = Annotated[QueryTotal, Depends(get_total)]
+
+
+async def unit_of_work(data_manager: PublicCrudDep):
+    # Function scope: committed after the route returns, before the response is sent
+    async with data_manager.unit_of_work():
+        yield
+
+
+UnitOfWorkDep = Depends(unit_of_work, scope="function")
+
+
+async def idempotent_request(
+    request: Request,
+    idempotency_key: str | None = Header(
+        None, min_length=1, max_length=255, description="Retries with the same key get the first response back"
+    )
+):
+    handle = IdempotentRequest(container.idempotency(), f"{request.method} {request.url.path}", idempotency_key)
+    succeeded = False
+    try:
+        yield handle
+        succeeded = True
+    finally:
+        handle.finish(succeeded)
+
+
+# Request scope: exits after the unit of work committed, so only committed responses are replayed
+IdempotencyDep = Annotated[IdempotentRequest, Depends(idempotent_request, scope="request")]
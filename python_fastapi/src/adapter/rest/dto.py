@@ -1,6 +1,7 @@
-from typing import Literal
+from functools import cache
+from typing import Literal, get_args
 from uuid import UUID
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 class CreateUser(BaseModel):
     name: str
@@ -24,6 +25,27 @@ class CreateResponse(BaseModel):
     record_name: str | None = None
 
 
+class CreateUsersBatch(BaseModel):
+    records: list[CreateUser] = Field(min_length=1, max_length=1000)
+
+
+class CreateTeamsBatch(BaseModel):
+    records: list[CreateTeam] = Field(min_length=1, max_length=1000)
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    record_id: UUID | None = None
+    record_name: str | None = None
+    error: str | None = None
+
+
+class BatchCreateResponse(BaseModel):
+    created: int
+    failed: int
+    results: list[BatchItemResult]
+
+
 class ReadEntity(BaseModel):
     record_id: UUID | None = None
     record_name: str | None = None
@@ -34,6 +56,23 @@ class QueryPagination(BaseModel):
     offset: int | None = None
     limit: int | None = None
     order: Literal["asc", "desc"] = "asc"
+    after: tuple[str, UUID] | None = None
+
+
+class QueryTotal(BaseModel):
+    include_total: bool = False
+    exact: bool = False
+
+
+class QuerySearch(BaseModel):
+    q: str
+    limit: int = 20
+    after: tuple[float, UUID] | None = None
+
+
+class QueryExpansion(BaseModel):
+    expand: Literal["none", "count", "members"] = "members"
+    members_limit: int = 100
 
 
 class ReadUserResponse(BaseModel):
@@ -56,4 +95,34 @@ class ReadTeamResponse(BaseModel):
     manager_id: UUID | None = None
     manager: ReadUserResponse | None = None
     users: list[ReadUserResponse] | None = None
+    users_count: int | None = None
     entity: Literal["teams"] = "teams"
+
+
+@cache
+def scalar_columns(response_model: type[BaseModel]) -> tuple[str, ...]:
+    """
+    Scalar fields of ``response_model``, without nested models, the constant
+    ``entity`` tag and the ``<relationship>_count`` sizes (not table columns).
+    """
+    return tuple(
+        name for name, field in response_model.model_fields.items()
+        if name != "entity" and not name.endswith("_count") and not _nests_model(field.annotation)
+    )
+
+
+@cache
+def projected_columns(response_model: type[BaseModel]) -> tuple[str, ...]:
+    """
+    Columns a projected read must select to build ``response_model``.
+    Returns an empty tuple when the model nests other models.
+    """
+    if any(_nests_model(field.annotation) for field in response_model.model_fields.values()):
+        return ()
+    return scalar_columns(response_model)
+
+
+def _nests_model(annotation) -> bool:
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return True
+    return any(_nests_model(arg) for arg in get_args(annotation))
@@ -0,0 +1,174 @@
+import asyncio
+from hashlib import blake2b
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+
+from adapter.sql.cache import LruTtlCache
+from ports.repository.data_base import DbAccess
+
+
+class StoredResponse:
+    __slots__ = ("fingerprint", "status_code", "body")
+
+    def __init__(self, fingerprint: str, status_code: int, body: bytes):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.body = body
+
+
+class IdempotencyStore:
+    """
+    Responses of completed requests by (scope, Idempotency-Key): in a bounded
+    LRU map whose entries expire after a TTL, and optionally in the
+    idempotency_keys table, written in the request's unit of work so the key
+    is stored if and only if the request's writes are. A request whose key is
+    in flight waits for that request instead of running again.
+    Single event loop only, like LruTtlCache.
+    """
+
+    table_id = "idempotency_keys"
+
+    def __init__(
+        self,
+        repository: DbAccess | None = None,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 86_400.0,
+    ):
+        self._repository = repository
+        self._completed = LruTtlCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._in_flight: dict[tuple[str, str], tuple[str, asyncio.Future]] = {}
+        self.ttl_seconds = ttl_seconds
+        self.replays = 0
+        self.waits = 0
+
+    def stats(self) -> dict:
+        return {
+            **self._completed.stats(),
+            "in_flight": len(self._in_flight),
+            "replays": self.replays,
+            "waits": self.waits,
+        }
+
+    async def begin(self, scope: str, key: str, fingerprint: str) -> StoredResponse | None:
+        """
+        The stored response of an earlier request with this key, or None when
+        the caller owns the key and must run the request, then ``finish`` it.
+        Raises ValueError when the key was used for a different request.
+        """
+        cache_key = (scope, key)
+        while True:
+            stored = self._completed.get(cache_key)
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+            in_flight = self._in_flight.get(cache_key)
+            if in_flight is None:
+                break
+            if in_flight[0] != fingerprint:
+                raise ValueError("Idempotency-Key is already used by a different request.")
+            self.waits += 1
+            # Shielded: a cancelled duplicate must not cancel the owner's result.
+            # None: the owner failed, try again (possibly as the new owner).
+            stored = await asyncio.shield(in_flight[1])
+            if stored is not None:
+                return self._replay(stored, fingerprint)
+
+        self._in_flight[cache_key] = (fingerprint, asyncio.get_running_loop().create_future())
+        if self._repository is not None:
+            try:
+                stored = await self._load(scope, key)
+            except BaseException:
+                self.finish(scope, key, None)
+                raise
+            if stored is not None:
+                self.finish(scope, key, stored)
+                return self._replay(stored, fingerprint)
+        return None
+
+    async def save(self, scope: str, key: str, stored: StoredResponse) -> None:
+        # Joins the request's unit of work: committed (or rolled back) with its writes
+        if self._repository is not None:
+            await self._repository.create_record(
+                table_id=self.table_id,
+                attributes={
+                    "name": f"{scope} {key}",
+                    "fingerprint": stored.fingerprint,
+                    "status_code": stored.status_code,
+                    "body": stored.body.decode(),
+                },
+            )
+
+    def finish(self, scope: str, key: str, stored: StoredResponse | None) -> None:
+        """Publish the owner's response (None when it failed) and wake up the duplicates."""
+        cache_key = (scope, key)
+        if stored is not None:
+            self._completed.set(cache_key, stored)
+        in_flight = self._in_flight.pop(cache_key, None)
+        if in_flight is not None and not in_flight[1].done():
+            in_flight[1].set_result(stored)
+
+    def _replay(self, stored: StoredResponse, fingerprint: str) -> StoredResponse:
+        if stored.fingerprint != fingerprint:
+            raise ValueError("Idempotency-Key is already used by a different request.")
+        self.replays += 1
+        return stored
+
+    async def _load(self, scope: str, key: str) -> StoredResponse | None:
+        record = await self._repository.read_record(table_id=self.table_id, record_name=f"{scope} {key}")
+        if record is None:
+            return None
+        created_at = record.created_at if record.created_at.tzinfo else record.created_at.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - created_at > timedelta(seconds=self.ttl_seconds):
+            # Expired: free the key for this request
+            await self._repository.delete_record(table_id=self.table_id, record_id=record.id)
+            return None
+        stored = StoredResponse(record.fingerprint, record.status_code, record.body.encode())
+        self._completed.set((scope, key), stored)
+        return stored
+
+
+class IdempotentRequest:
+    """
+    One request's view of the store, given to the route by the idempotency
+    dependency: ``replay`` before doing any work, ``respond`` with the result.
+    Without an Idempotency-Key both are no-ops.
+    """
+
+    def __init__(self, store: IdempotencyStore, scope: str, key: str | None):
+        self._store = store
+        self._scope = scope
+        self.key = key
+        self._fingerprint: str | None = None
+        self._owner = False
+        self._stored: StoredResponse | None = None
+
+    async def replay(self, body: BaseModel) -> Response | None:
+        if self.key is None:
+            return None
+        self._fingerprint = blake2b(body.model_dump_json().encode(), digest_size=16).hexdigest()
+        try:
+            stored = await self._store.begin(self._scope, self.key, self._fingerprint)
+        except ValueError as error:
+            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_CONTENT, detail=str(error)) from error
+        if stored is None:
+            self._owner = True
+            return None
+        return Response(
+            stored.body,
+            status_code=stored.status_code,
+            media_type="application/json",
+            headers={"Idempotent-Replayed": "true"},
+        )
+
+    async def respond(self, result: BaseModel, status_code: int = status.HTTP_201_CREATED):
+        if not self._owner:
+            return result
+        self._stored = StoredResponse(self._fingerprint, status_code, result.model_dump_json().encode())
+        await self._store.save(self._scope, self.key, self._stored)
+        return Response(self._stored.body, status_code=status_code, media_type="application/json")
+
+    def finish(self, succeeded: bool) -> None:
+        # After the unit of work: only a committed response is published
+        if self._owner:
+            self._store.finish(self._scope, self.key, self._stored if succeeded else None)
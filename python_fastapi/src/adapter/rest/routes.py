@@ -1,21 +1,40 @@
+from typing import AsyncIterator, Literal
 from uuid import UUID
-from fastapi import APIRouter, status
 
-from adapter.rest.di import PublicCrudDep, PaginationDep
+import orjson
+from fastapi import APIRouter, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+
+from config.settings import settings
+from adapter.rest.di import (
+    PublicCrudDep, PaginationDep, ExpansionDep, SearchDep, TotalDep, IdempotencyDep, UnitOfWorkDep,
+    encode_cursor, encode_search_cursor
+)
+from adapter.rest.conditional import (
+    record_validators, page_validators,
+    not_modified, not_modified_response
+)
 from adapter.rest.dto import (
     CreateResponse, CreateUser, CreateTeam,
-    ReadUserResponse, ReadTeamResponse
+    CreateUsersBatch, CreateTeamsBatch,
+    BatchCreateResponse, BatchItemResult,
+    ReadUserResponse, ReadTeamResponse,
+    projected_columns, scalar_columns
 )
 
 health_routes = APIRouter()
-crud_routes = APIRouter()
+crud_routes = APIRouter(dependencies=[UnitOfWorkDep])
+# A single create is its one write: with write coalescing on it runs outside a
+# unit of work, so it can join the concurrent creates' commit
+create_routes = APIRouter(dependencies=[] if settings.WRITE_COALESCING_ENABLED else [UnitOfWorkDep])
 
 @health_routes.get("/health", tags=["Health"])
 def health_check():
     return {"status": "ok"}
 
 
-@crud_routes.post(
+@create_routes.post(
     "/users",
     response_model=CreateResponse,
     status_code=status.HTTP_201_CREATED,
@@ -23,20 +42,24 @@ def health_check():
 )
 async def create_user(
     body: CreateUser,
-    data_manager: PublicCrudDep
+    data_manager: PublicCrudDep,
+    idempotency: IdempotencyDep
 ):
+    replay = await idempotency.replay(body)
+    if replay is not None:
+        return replay
     new_rec = await data_manager.process(
         operation="create",
         entity=body.entity,
         **body.model_dump(exclude={"entity"})
     )
-    return CreateResponse(
+    return await idempotency.respond(CreateResponse(
         record_id=new_rec.id,
         record_name=new_rec.name,
-    )
+    ))
 
 
-@crud_routes.post(
+@create_routes.post(
     "/teams",
     response_model=CreateResponse,
     status_code=status.HTTP_201_CREATED,
@@ -44,91 +67,323 @@ async def create_user(
 )
 async def create_team(
     body: CreateTeam,
-    data_manager: PublicCrudDep
+    data_manager: PublicCrudDep,
+    idempotency: IdempotencyDep
 ):
+    replay = await idempotency.replay(body)
+    if replay is not None:
+        return replay
     new_rec = await data_manager.process(
         operation="create",
         entity=body.entity,
         **body.model_dump(exclude={"entity"})
     )
-    return CreateResponse(
+    return await idempotency.respond(CreateResponse(
         record_id=new_rec.id,
         record_name=new_rec.name,
+    ))
+
+
+def set_next_cursor(response: Response, records: list, pagination) -> None:
+    # A full page means there may be more rows after the last one
+    if records and len(records) == (pagination.limit or 100):
+        last = records[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.name, last.id, pagination.order)
+
+
+def json_records(records, response_model: type[BaseModel]) -> bytes:
+    """
+    JSON body of ``response_model`` for projected rows (or one row), encoded
+    straight from the row values. Skips building and validating a response
+    model per row: the route keeps ``response_model`` for the OpenAPI schema only.
+    """
+    columns = projected_columns(response_model)
+    entity = response_model.model_fields["entity"].default
+
+    def fields(record) -> dict:
+        if hasattr(record, "_mapping"):
+            # Rows hold exactly the projected columns, in order
+            values = dict(zip(columns, record))
+        else:
+            # Entity cache hits are full records
+            values = {column: getattr(record, column) for column in columns}
+        values["entity"] = entity
+        return values
+
+    if isinstance(records, list):
+        return orjson.dumps([fields(record) for record in records])
+    return orjson.dumps(fields(records))
+
+
+def team_relations(expansion) -> dict:
+    # The manager is a single row: always loaded. Members are bounded by the expansion.
+    if expansion.expand == "members":
+        return {"manager": None, "users": expansion.members_limit}
+    if expansion.expand == "count":
+        return {"manager": None, "users": "count"}
+    return {"manager": None}
+
+
+def team_response(record, expansion) -> ReadTeamResponse:
+    team = ReadTeamResponse.model_validate(record)
+    if expansion.expand != "members":
+        # Members were not loaded: absent, rather than an empty team
+        team.users = None
+    return team
+
+
+async def set_total_count(response: Response, data_manager, entity: str, total) -> None:
+    # Only requests asking for it pay for the count, and not to answer 304
+    if response.status_code == status.HTTP_304_NOT_MODIFIED:
+        return
+    if total.include_total:
+        count = await data_manager.process(operation="count", entity=entity, exact=total.exact)
+        response.headers["X-Total-Count"] = str(count)
+
+
+team_json = TypeAdapter(ReadTeamResponse)
+team_page_json = TypeAdapter(list[ReadTeamResponse])
+
+
+def page_response(request: Request, body: bytes) -> Response:
+    # A page has no version of its own: the weak ETag is a digest of its body
+    validators = page_validators(body)
+    if not_modified(request, validators):
+        return not_modified_response(validators)
+    return Response(body, media_type="application/json", headers=validators)
+
+
+def batch_response(results: list) -> BatchCreateResponse:
+    items = [
+        BatchItemResult(index=index, error=str(result))
+        if isinstance(result, Exception)
+        else BatchItemResult(index=index, record_id=result.id, record_name=result.name)
+        for index, result in enumerate(results)
+    ]
+    failed = sum(1 for item in items if item.error is not None)
+    return BatchCreateResponse(
+        created=len(items) - failed,
+        failed=failed,
+        results=items,
+    )
+
+
+@crud_routes.post(
+    "/users:batch",
+    response_model=BatchCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Users"]
+)
+async def create_users_batch(
+    body: CreateUsersBatch,
+    data_manager: PublicCrudDep
+):
+    results = await data_manager.process(
+        operation="batch_create",
+        entity="users",
+        records=[record.model_dump(exclude={"entity"}) for record in body.records]
     )
+    return batch_response(results)
+
+
+@crud_routes.post(
+    "/teams:batch",
+    response_model=BatchCreateResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Teams"]
+)
+async def create_teams_batch(
+    body: CreateTeamsBatch,
+    data_manager: PublicCrudDep
+):
+    results = await data_manager.process(
+        operation="batch_create",
+        entity="teams",
+        records=[record.model_dump(exclude={"entity"}) for record in body.records]
+    )
+    return batch_response(results)
+
+
+@crud_routes.get(
+    "/users/search",
+    response_model=list[ReadUserResponse],
+    status_code=status.HTTP_200_OK,
+    responses={304: {"description": "Page unchanged since the ETag the client holds"}},
+    tags=["Users"]
+)
+async def search_users(
+    data_manager: PublicCrudDep,
+    search: SearchDep,
+    request: Request
+):
+    # Declared before /users/{record_id}, which would otherwise match "search"
+    records = await data_manager.process(
+        operation="search",
+        entity="users",
+        query=search.q,
+        limit=search.limit,
+        after=search.after,
+        columns=projected_columns(ReadUserResponse)
+    )
+    response = page_response(request, json_records(records, ReadUserResponse))
+    if len(records) == search.limit:
+        last = records[-1]
+        response.headers["X-Next-Cursor"] = encode_search_cursor(last.rank, last.id)
+    return response
 
 
 @crud_routes.get(
     "/users/{record_id}",
     response_model=ReadUserResponse,
     status_code=status.HTTP_200_OK,
+    responses={304: {"description": "Not modified since the ETag / date the client holds"}},
     tags=["Users"]
 )
 async def read_user_by_id(
     record_id: UUID,
-    data_manager: PublicCrudDep
+    data_manager: PublicCrudDep,
+    request: Request
 ):
+    # Version-only query first: an unchanged record is neither loaded nor serialized
+    version = await data_manager.process(operation="version", entity="users", record_id=record_id)
+    if version is not None and not_modified(request, record_validators(version)):
+        return not_modified_response(record_validators(version))
     record = await data_manager.process(
         operation="read",
         entity="users",
-        record_id=record_id
+        record_id=record_id,
+        # The version columns come after the projected ones: json_records ignores them
+        columns=(*projected_columns(ReadUserResponse), "created_at", "updated_at")
     )
-    return record
+    if record is None:
+        return record
+    # Validators of the record served, which the entity cache may hold in an
+    # older version than the one just read: never a fresh ETag on a stale body
+    validators = record_validators((record.id, record.updated_at or record.created_at))
+    return Response(json_records(record, ReadUserResponse), media_type="application/json", headers=validators)
 
 
 @crud_routes.get(
     "/users",
     response_model=list[ReadUserResponse],
     status_code=status.HTTP_200_OK,
+    responses={304: {"description": "Page unchanged since the ETag the client holds"}},
     tags=["Users"]
 )
 async def read_all_users(
     data_manager: PublicCrudDep,
-    pagination: PaginationDep
+    pagination: PaginationDep,
+    total: TotalDep,
+    request: Request
 ):
     records = await data_manager.process(
         operation="read",
         entity="users",
         offset=pagination.offset,
         limit=pagination.limit,
-        order=pagination.order
+        order=pagination.order,
+        after=pagination.after,
+        columns=projected_columns(ReadUserResponse)
     )
-    return records
+    response = page_response(request, json_records(records, ReadUserResponse))
+    set_next_cursor(response, records, pagination)
+    await set_total_count(response, data_manager, "users", total)
+    return response
 
 
 @crud_routes.get(
     "/teams/{record_id}",
     response_model=ReadTeamResponse,
     status_code=status.HTTP_200_OK,
+    responses={304: {"description": "Not modified since the ETag / date the client holds"}},
     tags=["Teams"]
 )
 async def read_team_by_id(
     record_id: UUID,
-    data_manager: PublicCrudDep
+    data_manager: PublicCrudDep,
+    expansion: ExpansionDep,
+    request: Request
 ):
+    # The version covers the manager and the members embedded in the team
+    validators = {}
+    version = await data_manager.process(operation="version", entity="teams", record_id=record_id)
+    if version is not None:
+        validators = record_validators(version, variant=f"{expansion.expand}:{expansion.members_limit}")
+        if not_modified(request, validators):
+            return not_modified_response(validators)
+    # Bounded relations: never served from the entity cache, the body is as
+    # recent as the version its validators come from, never older
     record = await data_manager.process(
         operation="read",
         entity="teams",
-        record_id=record_id
+        record_id=record_id,
+        relations=team_relations(expansion)
     )
-    return record
+    if record is None:
+        return record
+    body = team_json.dump_json(team_response(record, expansion))
+    return Response(body, media_type="application/json", headers=validators)
 
 
 @crud_routes.get(
     "/teams",
     response_model=list[ReadTeamResponse],
     status_code=status.HTTP_200_OK,
+    responses={304: {"description": "Page unchanged since the ETag the client holds"}},
     tags=["Teams"]
 )
 async def read_all_teams(
     data_manager: PublicCrudDep,
-    pagination: PaginationDep
+    pagination: PaginationDep,
+    expansion: ExpansionDep,
+    total: TotalDep,
+    request: Request
 ):
     records = await data_manager.process(
         operation="read",
         entity="teams",
         offset=pagination.offset,
         limit=pagination.limit,
-        order=pagination.order
+        order=pagination.order,
+        after=pagination.after,
+        relations=team_relations(expansion)
     )
-    return records
+    body = team_page_json.dump_json([team_response(record, expansion) for record in records])
+    response = page_response(request, body)
+    set_next_cursor(response, records, pagination)
+    await set_total_count(response, data_manager, "teams", total)
+    return response
+
+
+EXPORT_COLUMNS = {
+    "users": scalar_columns(ReadUserResponse),
+    "teams": scalar_columns(ReadTeamResponse),
+}
 
+
+async def ndjson_lines(batches: AsyncIterator) -> AsyncIterator[bytes]:
+    # One chunk per fetched batch: the next batch is only read once this one was sent
+    async for rows in batches:
+        yield b"".join(
+            orjson.dumps(dict(row._mapping), option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+
+@crud_routes.get(
+    "/export/{entity}",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One JSON record per line"}},
+    tags=["Export"]
+)
+async def export_entity(
+    entity: Literal["users", "teams"],
+    data_manager: PublicCrudDep
+):
+    batches = await data_manager.process(
+        operation="export",
+        entity=entity,
+        columns=EXPORT_COLUMNS[entity]
+    )
+    return StreamingResponse(ndjson_lines(batches), media_type="application/x-ndjson")
@@ -1,4 +1,5 @@
-from os import environ
+import asyncio
+from os import cpu_count, environ
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
@@ -8,14 +9,15 @@ import uvicorn
 from config.settings import settings
 from config.container import container
 from config.telemetry import setup_telemetry, shutdown_telemetry, instrument_app
-from adapter.rest.routes import health_routes, crud_routes
+from adapter.rest.routes import health_routes, create_routes, crud_routes
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     setup_telemetry() # Initialize telemetry per worker
     container.initialize()
-    if settings.ENVIRONMENT == "development":
+    # Several workers: start_web_server created the schema before spawning them
+    if settings.ENVIRONMENT == "development" and settings.WEB_WORKERS <= 1:
         await container.db_manager().init_db()
     yield
     await container.db_manager().close_session()
@@ -30,15 +32,33 @@ web_app = FastAPI(
 instrument_app(web_app)
 
 web_app.include_router(health_routes)
+web_app.include_router(create_routes)
 web_app.include_router(crud_routes)
 
-async def start_web_server():
-    await uvicorn.Server(
-        uvicorn.Config(
-            web_app,
-            host="0.0.0.0",
-            port=8080,
-            workers=4, # Multiple workers
-            log_level="info",
-        )
-    ).serve()
+async def _init_schema() -> None:
+    await container.db_manager().init_db()
+    await container.db_manager().close_session()
+
+def start_web_server(workers: int | None = None) -> None:
+    """
+    Serve web_app with ``workers`` processes (default WEB_WORKERS, 0: one per
+    CPU). With more than one, uvicorn's supervisor binds the socket once,
+    spawns the workers sharing it and replaces any worker that dies or stops
+    answering its health checks. Every worker runs ``lifespan`` on its own:
+    telemetry, container and database pools sized by ``settings.per_worker``.
+    """
+    workers = workers or settings.WEB_WORKERS or cpu_count() or 1
+    # Spawned workers load their settings again: give them the resolved count
+    environ["WEB_WORKERS"] = str(workers)
+    settings.WEB_WORKERS = workers
+    if settings.ENVIRONMENT == "development" and workers > 1:
+        container.initialize()
+        asyncio.run(_init_schema())
+    uvicorn.run(
+        # An import string: worker processes import the app themselves
+        "adapter.rest.server:web_app",
+        host=settings.WEB_HOST,
+        port=settings.WEB_PORT,
+        workers=workers,
+        log_level="info",
+    )
@@ -0,0 +1,266 @@
+from time import monotonic
+from uuid import UUID
+from typing import Callable
+from functools import partial
+from collections import OrderedDict
+
+from ports.repository.data_base import DbAccess
+
+
+class LruTtlCache:
+    """
+    Bounded LRU map whose entries also expire after a fixed TTL.
+    Single event loop only: no locking, every operation is synchronous.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries: OrderedDict = OrderedDict()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key, value) -> None:
+        self._entries[key] = (monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def keys(self):
+        return self._entries.keys()
+
+    def items(self):
+        return ((key, value) for key, (_, value) in self._entries.items())
+
+    def pop(self, key):
+        entry = self._entries.pop(key, None)
+        return None if entry is None else entry[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class CachedDbAccess(DbAccess):
+    """
+    Read-through cache for single-record reads (by id or by name) in front of
+    another DbAccess. Records are stored under (table, id); a name lookup goes
+    through a separate (table, name) -> id alias map, so invalidating the id
+    entry is enough for both. Writes invalidate the written record and the cached records that
+    embed it (a team embeds its members and its manager). Records read inside
+    a unit of work are stored once it commits: they may be rows it wrote,
+    which a rollback discards.
+
+    The cache is per process: with several workers, the TTL bounds how long a
+    worker can serve a record changed through another one.
+    """
+
+    # table -> (embedding table, foreign key on the table pointing at it)
+    embedded_in = {
+        "users": (("teams", "team_id"),),
+    }
+
+    def __init__(self, repository: DbAccess, max_entries: int = 10_000, ttl_seconds: float = 30.0):
+        self._repository = repository
+        self._records = LruTtlCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._names = LruTtlCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._lookups = LruTtlCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.invalidations = 0
+
+    def __getattr__(self, name):
+        return getattr(self._repository, name)
+
+    def stats(self) -> dict:
+        return {
+            **self._records.stats(),
+            "invalidations": self.invalidations,
+            "lookups": self._lookups.stats(),
+        }
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._names.clear()
+        self._lookups.clear()
+
+    def invalidate(self, table_id: str, record_id: UUID | None = None, record_name: str | None = None) -> None:
+        if record_id is None and record_name is not None:
+            record_id = self._names.pop((table_id, record_name))
+            if record_id is None:
+                # Only cached by id: find it by name (deletes are rare, the cache is bounded)
+                record_id = next((
+                    key[1] for key, record in self._records.items()
+                    if key[0] == table_id and record.name == record_name
+                ), None)
+        if record_id is not None and self._records.pop((table_id, record_id)) is not None:
+            self.invalidations += 1
+
+    def invalidate_table(self, table_id: str) -> None:
+        for key in [key for key in self._records.keys() if key[0] == table_id]:
+            self.invalidate(table_id, record_id=key[1])
+
+    def _invalidate_lookups(self, table_id: str) -> None:
+        for key in [key for key in self._lookups.keys() if key[0] == table_id]:
+            self._lookups.pop(key)
+
+    def _invalidate_embedding(self, table_id: str, record=None) -> None:
+        # A new row only changes the record its foreign key points at; updates
+        # and deletes may also move it away from another one, so drop them all.
+        for embedding_table, foreign_key in self.embedded_in.get(table_id, ()):
+            if record is None:
+                self.invalidate_table(embedding_table)
+            elif getattr(record, foreign_key, None) is not None:
+                self.invalidate(embedding_table, record_id=getattr(record, foreign_key))
+
+    def _invalidate_written(self, table_id: str, record_id: UUID | None = None, record_name: str | None = None) -> None:
+        self.invalidate(table_id, record_id=record_id, record_name=record_name)
+        self._invalidate_lookups(table_id)
+        self._invalidate_embedding(table_id)
+
+    def _after_write(self, invalidate: Callable[[], None]) -> None:
+        # Now, so a unit of work reads its own write, and again once it
+        # commits: concurrent requests may cache the old committed row meanwhile
+        invalidate()
+        self._repository.after_commit(invalidate)
+
+    def unit_of_work(self):
+        return self._repository.unit_of_work()
+
+    def after_commit(self, callback) -> None:
+        self._repository.after_commit(callback)
+
+    def query_records(self):
+        return self._repository.query_records()
+
+    async def create_record(self, table_id: str, attributes: dict):
+        record = await self._repository.create_record(table_id=table_id, attributes=attributes)
+        self._after_write(partial(self._invalidate_embedding, table_id, record))
+        return record
+
+    async def create_records(self, table_id: str, rows: list[dict]):
+        results = await self._repository.create_records(table_id=table_id, rows=rows)
+        self._after_write(partial(self._invalidate_embedding, table_id))
+        return results
+
+    async def read_record(
+        self,
+        table_id: str,
+        record_name: str | None = None,
+        record_id: UUID | None = None,
+        offset: int | None = None,
+        limit: int | None = None,
+        order: str | None = None,
+        after: tuple | None = None,
+        columns: tuple[str, ...] | None = None,
+        relations: dict | None = None,
+        ):
+        if record_id is None and record_name is None:
+            return await self._repository.read_record(
+                table_id=table_id, offset=offset, limit=limit, order=order, after=after,
+                columns=columns, relations=relations
+            )
+        if relations is not None:
+            # Partially loaded relationships: never served from or stored in the cache
+            return await self._repository.read_record(
+                table_id=table_id, record_name=record_name, record_id=record_id, relations=relations
+            )
+        # Projected reads are served from (and fill) the full-record cache
+
+        cached_id = record_id if record_id is not None else self._names.get((table_id, record_name))
+        record = self._records.get((table_id, cached_id))
+        # The alias may point at a record renamed since it was cached
+        if record is not None and (record_name is None or record.name == record_name):
+            return record
+
+        record = await self._repository.read_record(
+            table_id=table_id, record_name=record_name, record_id=record_id
+        )
+        if record is not None:
+            self._repository.after_commit(partial(self._store, table_id, record, record_name))
+        return record
+
+    def _store(self, table_id: str, record, record_name: str | None = None) -> None:
+        self._records.set((table_id, record.id), record)
+        if record_name is not None:
+            self._names.set((table_id, record_name), record.id)
+
+    async def read_version(self, table_id: str, record_name: str | None = None, record_id: UUID | None = None):
+        # Versions answer "has it changed?": always asked to the database
+        return await self._repository.read_version(
+            table_id=table_id, record_name=record_name, record_id=record_id
+        )
+
+    async def search_records(
+        self,
+        table_id: str,
+        query: str,
+        limit: int | None = None,
+        after: tuple | None = None,
+        columns: tuple[str, ...] | None = None,
+        ):
+        return await self._repository.search_records(
+            table_id=table_id, query=query, limit=limit, after=after, columns=columns
+        )
+
+    async def count_records(self, table_id: str, exact: bool = False):
+        return await self._repository.count_records(table_id=table_id, exact=exact)
+
+    async def lookup_record(self, table_id: str, field: str, value):
+        key = (table_id, field, value)
+        record = self._lookups.get(key)
+        if record is None:
+            record = await self._repository.lookup_record(table_id=table_id, field=field, value=value)
+            if record is not None:
+                self._repository.after_commit(partial(self._lookups.set, key, record))
+        return record
+
+    def stream_records(self, table_id: str, columns: tuple[str, ...] | None = None, batch_size: int = 1000):
+        return self._repository.stream_records(table_id=table_id, columns=columns, batch_size=batch_size)
+
+    async def update_record(
+        self,
+        table_id: str,
+        record_name: str | None = None,
+        record_id: UUID | None = None,
+        attributes: dict = {}
+        ):
+        record = await self._repository.update_record(
+            table_id=table_id, record_name=record_name, record_id=record_id, attributes=attributes
+        )
+        self._after_write(partial(self._invalidate_written, table_id, record_id=record.id))
+        return record
+
+    async def delete_record(self, table_id: str, record_name: str | None = None, record_id: UUID | None = None):
+        result = await self._repository.delete_record(
+            table_id=table_id, record_name=record_name, record_id=record_id
+        )
+        self._after_write(partial(self._invalidate_written, table_id, record_id=record_id, record_name=record_name))
+        return result
@@ -1,17 +1,57 @@
 from uuid import UUID
+from typing import Callable
+from functools import partial
+from collections import defaultdict
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
 
 from sqlmodel import select
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import selectinload
+from sqlalchemy import Float, bindparam, delete, func, insert, literal_column, tuple_, update
+from sqlalchemy import column, inspect, table, text, select as sa_select
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import aliased, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pydantic import ValidationError
 
-from adapter.sql.models import User, Team, Project, ProjectUserLink, ProjectRole
+from adapter.sql.models import (
+    User, Team, Project, ProjectUserLink, ProjectRole, IdempotencyKey,
+    search_columns, search_document
+)
 from adapter.sql.data_base import DatabaseManager
+from adapter.sql.loader import BatchLoader
+from adapter.sql.coalescer import WriteCoalescer
+from adapter.sql.cache import LruTtlCache
+from adapter.sql.statements import statements
 from ports.repository.data_base import DbAccess
 
 
+class _UnitOfWork:
+    """
+    Sessions of one unit of work: the primary session it commits, and a
+    replica session serving its reads until the first write. After a write
+    every read goes to the primary, so the request reads its own writes.
+    """
+    __slots__ = ("primary", "replica", "wrote", "committed")
+
+    def __init__(self, primary: AsyncSession):
+        self.primary = primary
+        self.replica: AsyncSession | None = None
+        self.wrote = False
+        # Callbacks run once the commit succeeded (cache invalidations)
+        self.committed: list[Callable[[], None]] = []
+
+
+# Unit of work active in the current task (one per HTTP request)
+_uow: ContextVar[_UnitOfWork | None] = ContextVar("uow", default=None)
+
+
 class QueryBuilder:
+    """
+    Builds a select over ``table_mapping`` and runs it on ``session``.
+    Without a session it only builds: ``statement`` is the result.
+    """
+
     def __init__(self, session, table_mapping):
         self._session = session
         self._table = table_mapping
@@ -21,10 +61,27 @@ class QueryBuilder:
     def table(self):
         return self._table
 
+    @property
+    def statement(self):
+        return self._statement
+
+    @staticmethod
+    def columns(table_mapping, table_id: str, names: tuple[str, ...]) -> list:
+        table_columns = table_mapping[table_id].__table__.c
+        unknown = [name for name in names if name not in table_columns]
+        if unknown:
+            raise ValueError(f"Table '{table_id}' has no columns {unknown}")
+        return [table_columns[name] for name in names]
+
     def select(self, model):
         self._statement = select(model)
         return self
 
+    def select_columns(self, table_id: str, *names: str):
+        # Projection: rows holding just these columns instead of full ORM entities
+        self._statement = select(*self.columns(self._table, table_id, names))
+        return self
+
     def where(self, *conditions):
         if self._statement is None:
             raise ValueError("Must call select() before where()")
@@ -52,35 +109,454 @@ class DbAccessImpl(DbAccess):
         "projects": Project,
         "started_projects": ProjectUserLink,
         "project_roles": ProjectRole,
+        "idempotency_keys": IdempotencyKey,
+    }
+    # Rows per multi-row INSERT ... RETURNING statement in create_records
+    batch_chunk_size = 500
+    # Relationships embedded in a record when it is read: part of its version
+    versioned_relations = {
+        "teams": ("manager", "users"),
     }
 
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(
+        self,
+        db_manager: DatabaseManager,
+        lookup_window_seconds: float = 0.0,
+        count_ttl_seconds: float = 30.0,
+        coalesce_window_seconds: float | None = None,
+        coalesce_max_batch_size: int = 100,
+        ):
         self._db_manager = db_manager
+        self._lookup_window_seconds = lookup_window_seconds
+        self._loaders: dict[tuple[str, str], BatchLoader] = {}
+        # None: every create commits on its own (or with its unit of work)
+        self._coalesce_window_seconds = coalesce_window_seconds
+        self._coalesce_max_batch_size = coalesce_max_batch_size
+        self._coalescers: dict[str, WriteCoalescer] = {}
+        # Exact row counts per table: dropped by this process' creates and
+        # deletes, the TTL bounds how stale other processes' writes leave them
+        self._counts = LruTtlCache(max_entries=len(self.table), ttl_seconds=count_ttl_seconds)
+
+    @asynccontextmanager
+    async def unit_of_work(self):
+        """
+        Share one session (one pooled connection, one transaction) between all
+        repository calls made inside the block and commit once when it exits.
+        Nested blocks join the outer unit of work.
+        """
+        if _uow.get() is not None:
+            yield
+            return
+        # Records loaded in the unit of work outlive its commit (responses, entity cache)
+        async with self._db_manager.get_session(expire_on_commit=False) as db:
+            uow = _UnitOfWork(db)
+            token = _uow.set(uow)
+            try:
+                yield
+                await db.commit()
+            except BaseException:
+                await db.rollback()
+                raise
+            finally:
+                _uow.reset(token)
+                if uow.replica is not None:
+                    await uow.replica.close()
+            for callback in uow.committed:
+                callback()
+
+    def after_commit(self, callback: Callable[[], None]) -> None:
+        """
+        Run ``callback`` once the current write is committed: right away
+        outside a unit of work, when the unit of work commits inside one
+        (never if it rolls back). Concurrent requests keep reading the old
+        committed row until then: what they cache meanwhile is dropped too.
+        """
+        uow = _uow.get()
+        if uow is None:
+            callback()
+        else:
+            uow.committed.append(callback)
+
+    def _drop_count(self, table_id: str) -> None:
+        # Now, for the unit of work's own reads, and again after its commit
+        self._counts.pop(table_id)
+        self.after_commit(partial(self._counts.pop, table_id))
+
+    @asynccontextmanager
+    async def _session(self, read_only: bool = False):
+        """
+        Session for one repository call: the unit of work's when one is active,
+        otherwise a new one. Reads go to a replica (when configured) until the
+        unit of work writes.
+        """
+        uow = _uow.get()
+        if uow is None:
+            async with self._db_manager.get_session(read_only=read_only) as db:
+                yield db
+        elif read_only and not uow.wrote and self._db_manager.has_replicas():
+            if uow.replica is None:
+                uow.replica = self._db_manager.get_session(expire_on_commit=False, read_only=True)
+            yield uow.replica
+        else:
+            uow.wrote = uow.wrote or not read_only
+            if uow.wrote and uow.replica is not None:
+                # Done with the replica: give its connection back before
+                # (possibly) waiting for the writer, instead of holding both
+                replica, uow.replica = uow.replica, None
+                await replica.close()
+            yield uow.primary
+
+    @staticmethod
+    async def _commit(db: AsyncSession) -> None:
+        # Inside a unit of work the owner commits; just send the pending changes
+        uow = _uow.get()
+        if uow is not None and db is uow.primary:
+            await db.flush()
+        else:
+            await db.commit()
+
+    def _columns(self, table_id: str, columns: tuple[str, ...]) -> list:
+        return QueryBuilder.columns(self.table, table_id, columns)
+
+    @staticmethod
+    def _filter(record_id: UUID | None, record_name: str | None) -> tuple[str, dict]:
+        # Filter kind (part of the statement key) and the values bound to it
+        return ("id", {"record_id": record_id}) if record_id else ("name", {"record_name": record_name})
+
+    def _match(self, table_id: str, kind: str):
+        model = self.table[table_id]
+        return model.id == bindparam("record_id") if kind == "id" else model.name == bindparam("record_name")
+
+    def _read_statement(
+        self,
+        table_id: str,
+        kind: str | None,
+        order: str | None,
+        keyset: bool,
+        columns: tuple[str, ...] | None,
+        eager: tuple[str, ...] | None = None,
+        ):
+        model = self.table[table_id]
+        # Projection: plain rows with only these columns, no ORM entities
+        builder = QueryBuilder(None, self.table)
+        statement = (builder.select_columns(table_id, *columns) if columns else builder.select(model)).statement
+        if eager is not None:
+            # Only the relationships loaded in full; the others are filled by
+            # _load_relations, never lazy loaded
+            statement = statement.options(*(
+                selectinload(relationship.class_attribute) if relationship.key in eager
+                else raiseload(relationship.class_attribute)
+                for relationship in model.__mapper__.relationships
+            ))
+        # Eager load sqlalchemy relationships for Team table
+        elif table_id == "teams" and not columns:
+            statement = statement.options(
+                selectinload(Team.manager),
+                selectinload(Team.users)
+            )
+        if kind:
+            return statement.where(self._match(table_id, kind))
+
+        # (order_field, id) is the sort key: id breaks ties on non-unique
+        # names so pages never overlap, and keyset pages seek on it.
+        order_field = model.created_at if table_id == "started_projects" else model.name
+        if keyset:
+            sort_key = tuple_(order_field, model.id)
+            after = tuple_(
+                bindparam("after_key", type_=order_field.type),
+                bindparam("after_id", type_=model.id.type),
+            )
+            statement = statement.where(sort_key < after if order == "desc" else sort_key > after)
+        else:
+            statement = statement.offset(bindparam("offset"))
+        statement = statement.limit(bindparam("limit"))
+        # Always ordered, ascending unless asked otherwise: a limited page
+        # (keyset or offset) of an unordered query is arbitrary
+        return statement.order_by(
+            *((order_field.desc(), model.id.desc()) if order == "desc"
+              else (order_field.asc(), model.id.asc()))
+        )
+
+    def _relationship(self, table_id: str, name: str):
+        relationship = self.table[table_id].__mapper__.relationships.get(name)
+        if relationship is None:
+            raise ValueError(f"Table '{table_id}' has no relationship '{name}'")
+        return relationship
+
+    def _relation_statement(self, table_id: str, name: str, counted: bool):
+        """
+        One query for a relationship of a whole page of parents, bound to the
+        parent keys: a grouped COUNT, or the first ``relation_limit`` related
+        rows per parent ranked by a row_number() window in (name, id) order.
+        """
+        relationship = self._relationship(table_id, name)
+        if not relationship.uselist:
+            raise ValueError(f"Relationship '{name}' of table '{table_id}' is not a collection")
+        target = relationship.mapper.class_
+        target_table = relationship.mapper.local_table
+        # Column holding the parent key: on the related table, or on the link table
+        parent_key = relationship.synchronize_pairs[0][1]
+        parents = parent_key.in_(bindparam("parents", expanding=True))
+        if counted:
+            return sa_select(parent_key, func.count()).where(parents).group_by(parent_key)
+
+        source = target_table
+        if relationship.secondary is not None:
+            source = target_table.join(relationship.secondary, relationship.secondaryjoin)
+        order = [target_table.c.name] if "name" in target_table.c else []
+        order += list(relationship.mapper.primary_key)
+        ranked = (
+            sa_select(
+                target_table,
+                parent_key.label("parent_key"),
+                func.row_number().over(partition_by=parent_key, order_by=order).label("row_number"),
+            )
+            .select_from(source)
+            .where(parents)
+            .subquery()
+        )
+        related = aliased(target, ranked)
+        return (
+            sa_select(related, ranked.c.parent_key)
+            .where(ranked.c.row_number <= bindparam("relation_limit"))
+            .order_by(ranked.c.parent_key, ranked.c.row_number)
+        )
+
+    async def _load_relations(self, db: AsyncSession, table_id: str, records: list, relations: dict) -> None:
+        """
+        Fill the bounded relationships of loaded records: ``"count"`` sets
+        ``<relationship>_count`` on each record, an int N sets the relationship
+        to its first N related records. Both run one query for all the records.
+        Relationships still unloaded are set empty.
+        """
+        for name, mode in relations.items():
+            if mode is None or not records:
+                continue
+            counted = mode == "count"
+            parent_column = self._relationship(table_id, name).synchronize_pairs[0][0]
+            keys = [getattr(record, parent_column.key) for record in records]
+            statement = statements.get(
+                ("relation", table_id, name, counted),
+                partial(self._relation_statement, table_id, name, counted),
+            )
+            params = {"parents": keys} if counted else {"parents": keys, "relation_limit": mode}
+            rows = (await db.exec(statement, params=params)).all()
+            if counted:
+                counts = dict(rows)
+                for record, key in zip(records, keys):
+                    # Not a mapped attribute: stored beside the loaded columns
+                    record.__dict__[f"{name}_count"] = counts.get(key, 0)
+            else:
+                related = defaultdict(list)
+                for member, key in rows:
+                    related[key].append(member)
+                for record, key in zip(records, keys):
+                    # Loaded state, not a change: flushing never touches the omitted rows
+                    set_committed_value(record, name, related.get(key, []))
+        for record in records:
+            unloaded = inspect(record).unloaded
+            for relationship in self.table[table_id].__mapper__.relationships:
+                if relationship.key in unloaded:
+                    set_committed_value(record, relationship.key, [] if relationship.uselist else None)
+
+    def _search_statement(self, table_id: str, dialect: str, keyset: bool, columns: tuple[str, ...] | None):
+        """
+        Ranked substring search through the table's search index. ``rank``
+        sorts ascending from the best match (FTS5 bm25 on SQLite, negated
+        trigram similarity on Postgres) and, with the id, is the keyset.
+        """
+        model = self.table[table_id]
+        table_name = model.__tablename__
+        selected = self._columns(table_id, columns) if columns else list(model.__table__.c)
+        if "id" not in [selected_column.key for selected_column in selected]:
+            selected.append(model.id)
+        if dialect == "sqlite":
+            fts = table(f"{table_name}_search", column("rowid"))
+            rank = func.bm25(literal_column(fts.name))
+            source = model.__table__.join(fts, model.search_id == fts.c.rowid)
+            matches = literal_column(fts.name).op("MATCH")(bindparam("query"))
+        elif dialect == "postgresql":
+            # Same expression as the GIN index, so the planner can use it
+            document = literal_column(f"({search_document(table_name)})")
+            rank = -func.similarity(document, bindparam("query"))
+            source = model.__table__
+            matches = document.ilike(bindparam("pattern"), escape="\\")
+        else:
+            raise ValueError(f"Search is not supported on '{dialect}'")
+
+        ranked = sa_select(*selected, rank.label("rank")).select_from(source).where(matches).subquery()
+        statement = sa_select(*(ranked.c[selected_column.key] for selected_column in selected), ranked.c.rank)
+        if keyset:
+            statement = statement.where(
+                tuple_(ranked.c.rank, ranked.c.id)
+                > tuple_(bindparam("after_rank", type_=Float), bindparam("after_id", type_=model.id.type))
+            )
+        return statement.order_by(ranked.c.rank, ranked.c.id).limit(bindparam("limit"))
+
+    @staticmethod
+    def _version(model):
+        return func.coalesce(model.updated_at, model.created_at)
+
+    def _version_statement(self, table_id: str, kind: str):
+        """
+        Version-only query: the record's id and last change time, plus, for
+        each embedded relationship, the last change time of the embedded
+        records (and how many a collection holds, so removals show up).
+        """
+        model = self.table[table_id]
+        columns = [model.id, self._version(model).label("version")]
+        for name in self.versioned_relations.get(table_id, ()):
+            relationship = self._relationship(table_id, name)
+            target = relationship.mapper.class_
+            related = sa_select(func.max(self._version(target))).where(relationship.primaryjoin)
+            columns.append(related.scalar_subquery().label(f"{name}_version"))
+            if relationship.uselist:
+                counted = sa_select(func.count()).select_from(target).where(relationship.primaryjoin)
+                columns.append(counted.scalar_subquery().label(f"{name}_count"))
+        return sa_select(*columns).where(self._match(table_id, kind))
+
+    @staticmethod
+    def _not_found(table_id: str, record_id: UUID | None, record_name: str | None) -> str:
+        identifier = f"id '{record_id}'" if record_id else f"name '{record_name}'"
+        return f"Record with {identifier} not found in table '{table_id}'."
+
+    def _returning_fast_path(self, kind: str, table_id: str, record_id: UUID | None) -> bool:
+        """
+        Single-statement UPDATE/DELETE ... RETURNING needs dialect support
+        (Postgres, SQLite 3.35+) and a filter matching at most one row: by id,
+        or by name only where the name column is unique.
+        """
+        dialect = self._db_manager.get_engine().dialect
+        if not getattr(dialect, f"{kind}_returning", False):
+            return False
+        return bool(record_id) or bool(self.table[table_id].__table__.c.name.unique)
 
     @asynccontextmanager
     async def query_records(self):
         try:
-            async with self._db_manager.get_session() as db:
+            async with self._session(read_only=True) as db:
                 yield QueryBuilder(db, self.table)
 
         except SQLAlchemyError as error:
             raise ValueError(f"Error occurred: {error}")
 
     async def create_record(self, table_id: str, attributes: dict):
+        """
+        With write coalescing on, a create made outside a unit of work is
+        committed together with the concurrent creates on the same table.
+        Inside one it is written through the unit of work's session, so a
+        rollback discards it.
+        """
         if not table_id or table_id not in self.table.keys():
             raise ValueError(f"Table '{table_id}' does not exist.")
         try:
             self.table[table_id].model_validate(attributes)
-            async with self._db_manager.get_session() as db:
+            if self._coalesce_window_seconds is not None and _uow.get() is None:
+                return await self._coalescer(table_id).submit(attributes)
+            async with self._session() as db:
                 rec = self.table[table_id](**attributes)
                 db.add(rec)
-                await db.commit()
+                await self._commit(db)
+                self._drop_count(table_id)
                 await db.refresh(rec)
                 return rec
 
         except (SQLAlchemyError, ValidationError) as error:
             raise ValueError(f"Error occurred: {error}")
 
+    def _coalescer(self, table_id: str) -> WriteCoalescer:
+        coalescer = self._coalescers.get(table_id)
+        if coalescer is None:
+            coalescer = self._coalescers[table_id] = WriteCoalescer(
+                partial(self._create_coalesced, table_id),
+                name=table_id,
+                window_seconds=self._coalesce_window_seconds,
+                max_batch_size=self._coalesce_max_batch_size,
+            )
+        return coalescer
+
+    async def _create_coalesced(self, table_id: str, batch: list[dict]) -> list:
+        # One transaction for the whole batch; a row rejected by a constraint
+        # is retried alone in a savepoint so it only fails its own caller.
+        model = self.table[table_id]
+        try:
+            async with self._db_manager.get_session(expire_on_commit=False) as db:
+                records: list = [model(**attributes) for attributes in batch]
+                try:
+                    async with db.begin_nested():
+                        db.add_all(records)
+                        await db.flush()
+                except IntegrityError:
+                    records = []
+                    for attributes in batch:
+                        record = model(**attributes)
+                        try:
+                            async with db.begin_nested():
+                                db.add(record)
+                                await db.flush()
+                            records.append(record)
+                        except IntegrityError as error:
+                            records.append(ValueError(f"Error occurred: {error.orig}"))
+                await db.commit()
+                self._counts.pop(table_id)
+                return records
+
+        except SQLAlchemyError as error:
+            raise ValueError(f"Error occurred: {error}")
+
+    async def create_records(self, table_id: str, rows: list[dict]):
+        """
+        Insert many rows in one transaction, one multi-row INSERT ... RETURNING
+        per chunk. Returns one entry per input row, in input order: the
+        inserted (id, name) row or the ValueError that rejected it.
+        """
+        if not table_id or table_id not in self.table.keys():
+            raise ValueError(f"Table '{table_id}' does not exist.")
+        model = self.table[table_id]
+        results: list = [None] * len(rows)
+        pending: list[tuple[int, dict]] = []
+        for index, attributes in enumerate(rows):
+            try:
+                pending.append((
+                    index,
+                    model.model_validate(attributes).model_dump(
+                        exclude={"created_at", "updated_at"}
+                    )
+                ))
+            except ValidationError as error:
+                results[index] = ValueError(f"Error occurred: {error}")
+        if not pending:
+            return results
+
+        statement = insert(model).returning(
+            model.id, model.name, sort_by_parameter_order=True
+        )
+        try:
+            async with self._session() as db:
+                for start in range(0, len(pending), self.batch_chunk_size):
+                    chunk = pending[start:start + self.batch_chunk_size]
+                    try:
+                        async with db.begin_nested():
+                            inserted = (await db.exec(statement, params=[values for _, values in chunk])).all()
+                    except IntegrityError:
+                        # Constraint violation somewhere in the chunk: retry row by row
+                        # so only the offending rows are reported as failed.
+                        inserted = []
+                        for _, values in chunk:
+                            try:
+                                async with db.begin_nested():
+                                    inserted.append((await db.exec(statement, params=[values])).one())
+                            except IntegrityError as error:
+                                inserted.append(ValueError(f"Error occurred: {error.orig}"))
+                    for (index, _), record in zip(chunk, inserted):
+                        results[index] = record
+                await self._commit(db)
+                self._drop_count(table_id)
+                return results
+
+        except SQLAlchemyError as error:
+            raise ValueError(f"Error occurred: {error}")
+
     async def read_record(
         self,
         table_id: str,
@@ -89,39 +565,243 @@ class DbAccessImpl(DbAccess):
         offset: int | None = None,
         limit: int | None = None,
         order: str | None = None,
+        after: tuple | None = None,
+        columns: tuple[str, ...] | None = None,
+        relations: dict | None = None,
         ):
+        """
+        ``relations`` bounds the relationships loaded with each record, by
+        name: None loads it in full, ``"count"`` only counts it (into
+        ``<relationship>_count``), an int N loads its first N records.
+        Relationships left out are not loaded. Without ``relations`` teams
+        load their manager and all their users.
+        """
         if not table_id or table_id not in self.table.keys():
             raise ValueError(f"Table '{table_id}' does not exist.")
         if record_name and table_id == "started_projects":
             raise ValueError(f"Table '{table_id}' does not support filtering by name")
+        if relations is not None and columns:
+            raise ValueError("Projected reads cannot load relationships")
+        for name, mode in (relations or {}).items():
+            self._relationship(table_id, name)
+            if not (mode is None or mode == "count" or (isinstance(mode, int) and mode >= 0)):
+                raise ValueError(f"Invalid load mode {mode!r} for relationship '{name}'")
 
         is_single_query = record_id is not None or record_name is not None
+        if record_id or record_name:
+            kind, params = self._filter(record_id, record_name)
+        elif after is not None:
+            kind, params = None, {"after_key": after[0], "after_id": after[1], "limit": limit or 100}
+        else:
+            kind, params = None, {"offset": offset or 0, "limit": limit or 100}
+        order = "desc" if order == "desc" else "asc"
+        columns = tuple(columns) if columns else None
+        eager = None if relations is None else tuple(
+            sorted(name for name, mode in relations.items() if mode is None)
+        )
         try:
-            async with self._db_manager.get_session() as db:
-                statement = select(self.table[table_id])
-                # Eager load sqlalchemy relationships for Team table
-                if table_id == "teams":
-                    statement = statement.options(
-                        selectinload(Team.manager),
-                        selectinload(Team.users)
-                    )
-                if record_id:
-                    statement = statement.where(self.table[table_id].id == record_id)
-                elif record_name:
-                    statement = statement.where(self.table[table_id].name == record_name)
-                else:
-                    statement = statement.offset(offset or 0).limit(limit or 100)
-                    if order in ("asc", "desc"):
-                        order_field = self.table[table_id].created_at if table_id == "started_projects" else self.table[table_id].name
-                        statement = statement.order_by(
-                            order_field.asc() if order == "asc" else order_field.desc()
-                        )
-                result = await db.exec(statement)
-                return result.first() if is_single_query else result.all()
+            statement = statements.get(
+                ("read", table_id, kind, order, after is not None, columns, eager),
+                partial(self._read_statement, table_id, kind, order, after is not None, columns, eager),
+            )
+            async with self._session(read_only=True) as db:
+                result = await db.exec(statement, params=params)
+                records = result.first() if is_single_query else result.all()
+                if relations is not None:
+                    page = [records] if is_single_query and records is not None else list(records or [])
+                    await self._load_relations(db, table_id, page, relations)
+                return records
 
         except (SQLAlchemyError, ValidationError) as error:
             raise ValueError(f"Error occurred: {error}")
 
+    async def read_version(
+        self,
+        table_id: str,
+        record_name: str | None = None,
+        record_id: UUID | None = None,
+        ):
+        """
+        Version of one record without loading it: a row holding its id, its
+        ``version`` (updated_at, else created_at) and the versions of the
+        records embedded in it. None when the record does not exist.
+        """
+        if not table_id or table_id not in self.table.keys():
+            raise ValueError(f"Table '{table_id}' does not exist.")
+        if not record_id and not record_name:
+            raise ValueError("Either 'id' or 'name' is required to read a version.")
+        kind, params = self._filter(record_id, record_name)
+        try:
+            statement = statements.get(
+                ("version", table_id, kind),
+                partial(self._version_statement, table_id, kind),
+            )
+            async with self._session(read_only=True) as db:
+                return (await db.exec(statement, params=params)).first()
+
+        except SQLAlchemyError as error:
+            raise ValueError(f"Error occurred: {error}")
+
+    async def search_records(
+        self,
+        table_id: str,
+        query: str,
+        limit: int | None = None,
+        after: tuple | None = None,
+        columns: tuple[str, ...] | None = None,
+        ):
+        """
+        Rows of ``table_id`` whose searchable columns contain ``query``
+        (case-insensitive), best match first. Each row ends with its ``rank``:
+        ``after=(rank, id)`` of the last row continues from it.
+        """
+        if not table_id or table_id not in self.table.keys():
+            raise ValueError(f"Table '{table_id}' does not exist.")
+        if self.table[table_id].__tablename__ not in search_columns:
+            raise ValueError(f"Table '{table_id}' does not support search")
+        # Both indexes match trigrams: shorter queries cannot use them
+        if len(query) < 3:
+            raise ValueError("Search queries need at least 3 characters")
+        dialect = self._db_manager.get_engine().dialect.name
+        columns = tuple(columns) if columns else None
+        if dialect == "sqlite":
+            # One FTS5 phrase: the query's own quotes and operators match literally
+            params = {"query": '"' + query.replace('"', '""') + '"'}
+        else:
+            pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params = {"query": query, "pattern": f"%{pattern}%"}
+        params["limit"] = limit or 20
+        if after is not None:
+            params.update(after_rank=after[0], after_id=after[1])
+        try:
+            statement = statements.get(
+                ("search", table_id, dialect, after is not None, columns),
+                partial(self._search_statement, table_id, dialect, after is not None, columns),
+            )
+            async with self._session(read_only=True) as db:
+                return (await db.exec(statement, params=params)).all()
+
+        except SQLAlchemyError as error:
+            raise ValueError(f"Error occurred: {error}")
+
+    async def count_records(self, table_id: str, exact: bool = False) -> int:
+        """
+        Rows in a table. Approximate counts come from the planner statistics
+        (pg_class.reltuples, sqlite_stat1) and cost no scan; without statistics
+        they fall back to the exact count, which is cached per table.
+        """
+        if not table_id or table_id not in self.table.keys():
+            raise ValueError(f"Table '{table_id}' does not exist.")
+        table_name = self.table[table_id].__tablename__
+        try:
+            async with self._session(read_only=True) as db:
+                if not exact:
+                    estimate = await self._estimate_count(db, table_name)
+                    if estimate is not None:
+                        return estimate
+                count = self._counts.get(table_id)
+                if count is None:
+                    statement = statements.get(
+                        ("count", table_id),
+                        lambda: sa_select(func.count()).select_from(self.table[table_id]),
+                    )
+                    count = (await db.exec(statement)).scalar_one()
+                    self._counts.set(table_id, count)
+                return count
+
+        except SQLAlchemyError as error:
+            raise ValueError(f"Error occurred: {error}")
+
+    async def _estimate_count(self, db: AsyncSession, table_name: str) -> int | None:
+        dialect = self._db_manager.get_engine().dialect.name
+        if dialect == "postgresql":
+            # -1 (or 0 on older servers) until the table was first vacuumed/analyzed
+            estimate = (await db.exec(
+                text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"),
+                params={"table": f'"{table_name}"'},
+            )).scalar()
+            return estimate if estimate is not None and estimate > 0 else None
+        if dialect == "sqlite":
+            # Written by ANALYZE (and PRAGMA optimize): "<rows> <rows per key>..."
+            exists = (await db.exec(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            )).first()
+            if exists is None:
+                return None
+            stat = (await db.exec(
+                text("SELECT stat FROM sqlite_stat1 WHERE tbl = :table LIMIT 1"),
+                params={"table": table_name},
+            )).scalar()
+            return int(stat.split()[0]) if stat else None
+        return None
+
+    async def lookup_record(self, table_id: str, field: str, value):
+        """
+        Fetch one record by a unique column. Concurrent lookups on the same
+        table and column are batched into one ``WHERE field IN (...)`` query.
+        A batch serving several callers runs in its own session, outside any
+        unit of work, so it only sees committed rows.
+        """
+        if not table_id or table_id not in self.table.keys():
+            raise ValueError(f"Table '{table_id}' does not exist.")
+        column = self.table[table_id].__table__.c.get(field)
+        if column is None or not (column.unique or column.primary_key):
+            raise ValueError(f"Table '{table_id}' does not support lookups by '{field}'")
+
+        loader = self._loaders.get((table_id, field))
+        if loader is None:
+            loader = self._loaders[(table_id, field)] = BatchLoader(
+                partial(self._load_records, table_id, field),
+                name=f"{table_id}.{field}",
+                window_seconds=self._lookup_window_seconds,
+            )
+        return await loader.load(value)
+
+    async def _load_records(self, table_id: str, field: str, values: list, shared: bool) -> dict:
+        model = self.table[table_id]
+        statement = statements.get(
+            ("lookup", table_id, field),
+            lambda: select(model).where(getattr(model, field).in_(bindparam("values", expanding=True))),
+        )
+        try:
+            async with (
+                self._db_manager.get_session(read_only=True) if shared else self._session(read_only=True)
+            ) as db:
+                result = await db.exec(statement, params={"values": values})
+                return {getattr(record, field): record for record in result.all()}
+
+        except SQLAlchemyError as error:
+            raise ValueError(f"Error occurred: {error}")
+
+    def stream_records(
+        self,
+        table_id: str,
+        columns: tuple[str, ...] | None = None,
+        batch_size: int = 1000,
+        ):
+        """
+        Iterate a whole table as lists of at most ``batch_size`` rows read from
+        a server-side cursor, so memory stays flat whatever the table size. The
+        stream owns its session: it outlives the caller's unit of work.
+        """
+        if not table_id or table_id not in self.table.keys():
+            raise ValueError(f"Table '{table_id}' does not exist.")
+        if columns:
+            statement = select(*self._columns(table_id, columns))
+        else:
+            statement = select(*self.table[table_id].__table__.c)
+        return self._stream(statement.execution_options(yield_per=batch_size), batch_size)
+
+    async def _stream(self, statement, batch_size: int):
+        try:
+            async with self._db_manager.get_session(read_only=True) as db:
+                result = await db.stream(statement)
+                async for rows in result.partitions(batch_size):
+                    yield rows
+
+        except SQLAlchemyError as error:
+            raise ValueError(f"Error occurred: {error}")
+
     async def update_record(
         self,
         table_id: str,
@@ -139,31 +819,62 @@ class DbAccessImpl(DbAccess):
         if record_name and table_id == "started_projects":
             raise ValueError(f"Table '{table_id}' does not support filtering by name")
 
+        values = {
+            key: value for key, value in attributes.items()
+            if key not in ("id", "created_at", "updated_at") and value is not None
+            and not (key == "name" and record_name and not record_id)
+        }
+        kind, params = self._filter(record_id, record_name)
         try:
-            async with self._db_manager.get_session() as db:
-                statement = select(self.table[table_id]).where(
-                    self.table[table_id].id == record_id if record_id
-                    else self.table[table_id].name == record_name
+            async with self._session() as db:
+                if values and self._returning_fast_path("update", table_id, record_id):
+                    # One UPDATE ... RETURNING: no read-modify-write window, no refresh
+                    statement = statements.get(
+                        ("update", table_id, kind, tuple(sorted(values))),
+                        partial(self._update_statement, table_id, kind, sorted(values)),
+                    )
+                    updated_record = (await db.exec(
+                        statement, params={**params, **{f"set_{key}": value for key, value in values.items()}}
+                    )).scalars().first()
+                    if not updated_record:
+                        raise ValueError(self._not_found(table_id, record_id, record_name))
+                    # Detached before commit so it is not expired by it
+                    db.expunge(updated_record)
+                    await self._commit(db)
+                    return updated_record
+
+                statement = statements.get(
+                    ("match", table_id, kind),
+                    lambda: select(self.table[table_id]).where(self._match(table_id, kind)),
                 )
-                result = await db.exec(statement)
+                result = await db.exec(statement, params=params)
                 existing_record = result.first()
 
                 if not existing_record:
-                    identifier = f"id '{record_id}'" if record_id else f"name '{record_name}'"
-                    raise ValueError(f"Record with {identifier} not found in table '{table_id}'.")
+                    raise ValueError(self._not_found(table_id, record_id, record_name))
 
-                for key, value in attributes.items():
-                    if key not in ("id", "created_at", "updated_at") and value is not None:
-                        if not (key == "name" and record_name and not record_id):
-                            setattr(existing_record, key, value)
+                for key, value in values.items():
+                    setattr(existing_record, key, value)
                 db.add(existing_record)
-                await db.commit()
+                await self._commit(db)
                 await db.refresh(existing_record)
                 return existing_record
 
         except (SQLAlchemyError, ValidationError) as error:
             raise ValueError(f"Error occurred: {error}")
 
+    def _update_statement(self, table_id: str, kind: str, keys: list[str]):
+        model = self.table[table_id]
+        return (
+            update(model)
+            .where(self._match(table_id, kind))
+            .values({
+                column.key: bindparam(f"set_{column.key}", type_=column.type)
+                for column in self._columns(table_id, tuple(keys))
+            })
+            .returning(model)
+        )
+
     async def delete_record(self, table_id: str, record_name: str | None = None, record_id: UUID | None = None):
         if not table_id or table_id not in self.table.keys():
             raise ValueError(f"Table '{table_id}' does not exist.")
@@ -171,18 +882,33 @@ class DbAccessImpl(DbAccess):
             raise ValueError("Either 'id' or 'name' is required for delete operation.")
         if record_name and table_id == "started_projects":
             raise ValueError(f"Table '{table_id}' does not support filtering by name")
+        kind, params = self._filter(record_id, record_name)
         try:
-            async with self._db_manager.get_session() as db:
-                statement = select(self.table[table_id]).where(
-                    self.table[table_id].id == record_id if record_id else self.table[table_id].name == record_name
+            async with self._session() as db:
+                if self._returning_fast_path("delete", table_id, record_id):
+                    statement = statements.get(
+                        ("delete", table_id, kind),
+                        lambda: delete(self.table[table_id])
+                        .where(self._match(table_id, kind))
+                        .returning(self.table[table_id].id),
+                    )
+                    if (await db.exec(statement, params=params)).first() is None:
+                        raise ValueError(self._not_found(table_id, record_id, record_name))
+                    await self._commit(db)
+                    self._drop_count(table_id)
+                    return {"message": f"Record deleted successfully"}
+
+                statement = statements.get(
+                    ("match", table_id, kind),
+                    lambda: select(self.table[table_id]).where(self._match(table_id, kind)),
                 )
-                result = await db.exec(statement)
+                result = await db.exec(statement, params=params)
                 existing_record = result.first()
                 if not existing_record:
-                    identifier = f"id '{record_id}'" if record_id else f"name '{record_name}'"
-                    raise ValueError(f"Record with {identifier} not found in table '{table_id}'.")
+                    raise ValueError(self._not_found(table_id, record_id, record_name))
                 await db.delete(existing_record)
-                await db.commit()
+                await self._commit(db)
+                self._drop_count(table_id)
                 return {"message": f"Record deleted successfully"}
 
         except (SQLAlchemyError, ValidationError) as error:
@@ -1,64 +1,146 @@
-from sqlmodel import SQLModel
+from itertools import cycle
+
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine
 from sqlalchemy import event
 
 from config.settings import settings
+from config.telemetry import instrument_db_pool
 
 
 class DatabaseManager:
     _engine: AsyncEngine | None = None
+    _replica_engines: list[AsyncEngine] | None = None
+    _read_engines: list[AsyncEngine] | None = None
+    _read_cycle = None
 
     @classmethod
     def get_engine(cls) -> AsyncEngine:
         if cls._engine is None:
             cls._engine = cls._create_engine(settings.ENVIRONMENT)
+            instrument_db_pool(cls._engine, pool_name="primary")
         return cls._engine
 
+    @classmethod
+    def get_replica_engines(cls) -> list[AsyncEngine]:
+        if cls._replica_engines is None:
+            urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+            cls._replica_engines = [
+                cls._create_engine(settings.ENVIRONMENT, connection_string=url) for url in urls
+            ]
+            for index, engine in enumerate(cls._replica_engines):
+                instrument_db_pool(engine, pool_name=f"replica-{index}")
+        return cls._replica_engines
+
+    @classmethod
+    def get_read_engines(cls) -> list[AsyncEngine]:
+        """
+        Engines serving reads apart from the primary: the replicas, or the
+        read pool of the tuned SQLite profile, whose primary is its writer.
+        """
+        if cls._read_engines is None:
+            cls._read_engines = list(cls.get_replica_engines())
+            if not cls._read_engines and cls._tuned_sqlite(settings.ENVIRONMENT):
+                reader = cls._create_engine(settings.ENVIRONMENT, read_only=True)
+                instrument_db_pool(reader, pool_name="reader")
+                cls._read_engines.append(reader)
+            cls._read_cycle = cycle(cls._read_engines)
+        return cls._read_engines
+
+    @classmethod
+    def has_replicas(cls) -> bool:
+        return bool(cls.get_read_engines())
+
+    @classmethod
+    def get_read_engine(cls) -> AsyncEngine:
+        # Round robin over the read engines; the primary serves reads when there are none
+        if not cls.get_read_engines():
+            return cls.get_engine()
+        return next(cls._read_cycle)
+
     @classmethod
     def reset_engine(cls) -> None:
         cls._engine = None
+        cls._replica_engines = None
+        cls._read_engines = None
+        cls._read_cycle = None
 
     @classmethod
     async def init_db(cls) -> None:
         engine = cls.get_engine()
         if settings.ENVIRONMENT in ["development", "test"]:
-            from adapter.sql.models import User, Team, Project, ProjectRole, ProjectUserLink
-            async with engine.begin() as conn:
-                await conn.run_sync(SQLModel.metadata.create_all)
+            # Local replicas are stand-in databases without replication: give them the schema too
+            for target in [engine, *cls.get_replica_engines()]:
+                await cls.migrate(target)
+
+    @classmethod
+    async def migrate(cls, engine: AsyncEngine | None = None) -> None:
+        """Create or upgrade the schema (adapter/sql/migrations.py) of ``engine``, the primary by default."""
+        from adapter.sql.migrations import migrate
+        async with (engine or cls.get_engine()).begin() as conn:
+            await conn.run_sync(migrate)
 
     @classmethod
-    def get_session(cls) -> AsyncSession:
-        return AsyncSession(cls.get_engine())
+    def get_session(cls, expire_on_commit: bool = True, read_only: bool = False) -> AsyncSession:
+        engine = cls.get_read_engine() if read_only else cls.get_engine()
+        return AsyncSession(engine, expire_on_commit=expire_on_commit)
 
     @classmethod
     async def close_session(cls) -> bool:
-        engine = cls.get_engine()
-        await engine.dispose()
+        for engine in [cls.get_engine(), *cls.get_read_engines()]:
+            await engine.dispose()
         cls.reset_engine()
         return True
 
+    @staticmethod
+    def _tuned_sqlite(env: str) -> bool:
+        return env in ["development", "test"] and settings.SQLITE_TUNED_PROFILE
+
     @classmethod
-    def _create_engine(cls, env: str) -> AsyncEngine:
+    def _create_engine(
+        cls,
+        env: str,
+        connection_string: str | None = None,
+        read_only: bool = False,
+        ) -> AsyncEngine:
         if env not in ["development", "test"]:
-            connection_string = settings.PSQL_DATABASE_URL
+            connection_string = connection_string or settings.PSQL_DATABASE_URL
             return create_async_engine(
                 connection_string,
                 echo = False,
                 future = True,
                 pool_pre_ping = True,
-                pool_size = 20,
-                max_overflow = 2,
+                pool_size = settings.per_worker(settings.DB_POOL_SIZE),
+                max_overflow = settings.per_worker(settings.DB_MAX_OVERFLOW, minimum=0),
                 pool_timeout = 30,
                 pool_recycle = 7200,
             )
         else:
-            if env == "development":
-                connection_string = settings.DEV_SQLITE_URL
-            elif env == "test":
-                connection_string = settings.TEST_SQLITE_URL
-            else:
-                raise ValueError("Invalid ENVIRONMENT value")
+            if connection_string is None:
+                if env == "development":
+                    connection_string = settings.DEV_SQLITE_URL
+                elif env == "test":
+                    connection_string = settings.TEST_SQLITE_URL
+                else:
+                    raise ValueError("Invalid ENVIRONMENT value")
+            pragmas = ["PRAGMA foreign_keys=ON;"]
+            pool_options = {}
+            if cls._tuned_sqlite(env):
+                # WAL: readers never block the writer nor the writer the readers.
+                # The primary is a single writer connection: writers queue for it
+                # on the pool instead of failing with "database is locked".
+                pragmas += [
+                    "PRAGMA journal_mode=WAL;",
+                    "PRAGMA synchronous=NORMAL;",
+                    f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE};",
+                    f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE};",
+                    f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS};",
+                ]
+                if read_only:
+                    pragmas.append("PRAGMA query_only=ON;")
+                    pool_options = {"pool_size": settings.SQLITE_READ_POOL_SIZE, "max_overflow": 0}
+                else:
+                    pool_options = {"pool_size": 1, "max_overflow": 0}
             dev_engine = create_async_engine(
                 connection_string,
                 echo = True if settings.DEBUG_SQLALCHEMY == "True" else False,
@@ -66,12 +148,16 @@ class DatabaseManager:
                     "check_same_thread": False
                 },
                 future = True,
-                pool_pre_ping = True,
+                # Tuned: a local file has no server to drop the connection, and
+                # a ping on checkout would lengthen every turn on the writer
+                pool_pre_ping = not cls._tuned_sqlite(env),
+                **pool_options,
             )
             @event.listens_for(dev_engine.sync_engine, "connect")
             def set_sqlite_pragma(dbapi_conn, connection_record):
                 cursor = dbapi_conn.cursor()
-                cursor.execute("PRAGMA foreign_keys=ON;")
+                for pragma in pragmas:
+                    cursor.execute(pragma)
                 cursor.close()
 
             return dev_engine
@@ -0,0 +1,130 @@
+import asyncio
+from time import perf_counter
+from weakref import WeakKeyDictionary
+from typing import Any, Awaitable, Callable, Hashable
+
+from opentelemetry import metrics
+
+
+meter = metrics.get_meter("adapter.sql.loader")
+batch_size_histogram = meter.create_histogram(
+    "db.loader.batch_size",
+    unit="{key}",
+    description="Distinct keys resolved by one batched lookup query",
+)
+batch_wait_histogram = meter.create_histogram(
+    "db.loader.wait_time",
+    unit="s",
+    description="Time between the first key of a batch being requested and the batch query starting",
+)
+
+
+class _Batch:
+    __slots__ = ("futures", "waiters", "started", "dispatched")
+
+    def __init__(self):
+        self.futures: dict[Hashable, asyncio.Future] = {}
+        self.waiters = 0
+        self.started = perf_counter()
+        self.dispatched = False
+
+
+class BatchLoader:
+    """
+    DataLoader-style batching: keys requested by concurrent callers on the same
+    event loop within one window (by default, one loop tick) are collapsed into
+    a single call to ``batch_fn(keys, shared) -> {key: value}``. Duplicate keys
+    share one future. Missing keys resolve to None; a failing batch fails every
+    caller.
+
+    The first caller of a batch waits out the window. If nobody joined, it runs
+    the batch itself (``shared=False``: it may use the caller's own session);
+    otherwise the batch runs in a separate task on behalf of all callers
+    (``shared=True``).
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list, bool], Awaitable[dict]],
+        name: str,
+        window_seconds: float = 0.0,
+        max_batch_size: int = 500,
+    ):
+        self._batch_fn = batch_fn
+        self._window_seconds = window_seconds
+        self._max_batch_size = max_batch_size
+        self._attributes = {"db.loader.name": name}
+        self._batches: WeakKeyDictionary[asyncio.AbstractEventLoop, _Batch] = WeakKeyDictionary()
+        # Shared batches in flight: the loop only keeps weak references to tasks
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+        self.keys = 0
+        self.deduplicated = 0
+
+    def stats(self) -> dict:
+        return {"batches": self.batches, "keys": self.keys, "deduplicated": self.deduplicated}
+
+    async def load(self, key: Hashable) -> Any:
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(loop)
+        if batch is not None:
+            future = self._join(loop, batch, key)
+            # Shielded: a cancelled caller must not cancel the result shared with others
+            return await asyncio.shield(future)
+
+        batch = self._batches[loop] = _Batch()
+        future = self._join(loop, batch, key)
+        try:
+            await asyncio.sleep(self._window_seconds)
+        except asyncio.CancelledError:
+            # Hand the batch over to the callers that joined it
+            if not batch.dispatched:
+                self._close(loop, batch)
+                self._run_shared(loop, batch)
+            raise
+        if not batch.dispatched:
+            self._close(loop, batch)
+            if batch.waiters == 1:
+                await self._run(batch, shared=False)
+                return future.result()
+            self._run_shared(loop, batch)
+        return await asyncio.shield(future)
+
+    def _join(self, loop: asyncio.AbstractEventLoop, batch: _Batch, key: Hashable) -> asyncio.Future:
+        batch.waiters += 1
+        future = batch.futures.get(key)
+        if future is not None:
+            self.deduplicated += 1
+            return future
+        future = batch.futures[key] = loop.create_future()
+        if len(batch.futures) >= self._max_batch_size:
+            self._close(loop, batch)
+            self._run_shared(loop, batch)
+        return future
+
+    def _run_shared(self, loop: asyncio.AbstractEventLoop, batch: _Batch) -> None:
+        task = loop.create_task(self._run(batch, shared=True))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _close(self, loop: asyncio.AbstractEventLoop, batch: _Batch) -> None:
+        batch.dispatched = True
+        if self._batches.get(loop) is batch:
+            del self._batches[loop]
+
+    async def _run(self, batch: _Batch, shared: bool) -> None:
+        keys = list(batch.futures)
+        self.batches += 1
+        self.keys += len(keys)
+        batch_size_histogram.record(len(keys), self._attributes)
+        batch_wait_histogram.record(perf_counter() - batch.started, self._attributes)
+        try:
+            results = await self._batch_fn(keys, shared)
+        except Exception as error:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for key, future in batch.futures.items():
+            if not future.done():
+                future.set_result(results.get(key))
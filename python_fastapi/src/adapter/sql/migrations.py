@@ -0,0 +1,116 @@
+"""
+Schema of the service: the tables (create_all, which only creates missing
+ones), then the changes create_all does not make, indexes and columns added
+to existing tables and the search indexes (raw DDL). Every step is
+idempotent. DatabaseManager.init_db applies them in development and test;
+other environments run them once per release, before starting the service:
+
+    PYTHONPATH=src python -m adapter.sql.migrations
+"""
+import asyncio
+
+from sqlmodel import SQLModel
+from sqlalchemy import Connection, inspect, text
+
+from adapter.sql.models import search_columns, search_document
+
+
+def add_user_team_id_index(connection: Connection) -> None:
+    # Members of a team (relations, team versions) are read by team_id
+    connection.exec_driver_sql('CREATE INDEX IF NOT EXISTS ix_user_team_id ON "user" (team_id)')
+
+
+def add_search_id(connection: Connection, table_name: str) -> None:
+    """
+    search_id: stable integer key of the SQLite search index, assigned by its
+    insert trigger (the implicit rowid of a table without an INTEGER PRIMARY
+    KEY may change on VACUUM). Unused, so left NULL, on Postgres.
+    """
+    columns = {column["name"] for column in inspect(connection).get_columns(table_name)}
+    if "search_id" not in columns:
+        connection.exec_driver_sql(f'ALTER TABLE "{table_name}" ADD COLUMN search_id INTEGER')
+    connection.exec_driver_sql(
+        f'CREATE UNIQUE INDEX IF NOT EXISTS ix_{table_name}_search_id ON "{table_name}" (search_id)'
+    )
+    if connection.dialect.name == "sqlite":
+        # Rows written before the insert trigger existed
+        connection.exec_driver_sql(
+            f'UPDATE "{table_name}" SET search_id = rowid + '
+            f'(SELECT coalesce(max(search_id), 0) FROM "{table_name}") WHERE search_id IS NULL'
+        )
+
+
+def create_sqlite_search_index(connection: Connection, table_name: str) -> None:
+    """
+    External-content FTS5 table with the trigram tokenizer, keyed on
+    search_id and kept in sync by triggers. A table keyed otherwise (earlier
+    versions used the rowid) is dropped; a new one is rebuilt from the rows.
+    """
+    columns = search_columns[table_name]
+    listed = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    fts = f"{table_name}_search"
+    existing = connection.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": fts}
+    ).scalar()
+    if existing is not None and "content_rowid='search_id'" not in existing:
+        connection.exec_driver_sql(f"DROP TABLE {fts}")
+        existing = None
+    connection.exec_driver_sql(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{listed}, content='{table_name}', content_rowid='search_id', tokenize='trigram')"
+    )
+    triggers = {
+        # new.search_id is read before the UPDATE: select the assigned value
+        "insert": f'AFTER INSERT ON "{table_name}" BEGIN '
+        f'UPDATE "{table_name}" SET search_id = (SELECT coalesce(max(search_id), 0) + 1 FROM "{table_name}") '
+        f"WHERE rowid = new.rowid AND search_id IS NULL; "
+        f"INSERT INTO {fts}(rowid, {listed}) "
+        f'SELECT search_id, {listed} FROM "{table_name}" WHERE rowid = new.rowid; END',
+        "delete": f'AFTER DELETE ON "{table_name}" BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {listed}) VALUES ('delete', old.search_id, {old}); END",
+        "update": f'AFTER UPDATE OF {listed} ON "{table_name}" BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {listed}) VALUES ('delete', old.search_id, {old}); "
+        f"INSERT INTO {fts}(rowid, {listed}) VALUES (new.search_id, {new}); END",
+    }
+    # Replaced rather than kept: an existing trigger may have an older body
+    for name, body in triggers.items():
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts}_{name}")
+        connection.exec_driver_sql(f"CREATE TRIGGER {fts}_{name} {body}")
+    if existing is None:
+        connection.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def create_postgresql_search_index(connection: Connection, table_name: str) -> None:
+    # Same expression as DbAccessImpl._search_statement, so the planner can use it
+    connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    connection.exec_driver_sql(
+        f'CREATE INDEX IF NOT EXISTS ix_{table_name}_search_trgm ON "{table_name}" '
+        f"USING gin (({search_document(table_name)}) gin_trgm_ops)"
+    )
+
+
+def migrate(connection: Connection) -> None:
+    """Apply every step, in order, on ``connection`` (in its transaction)."""
+    dialect = connection.dialect.name
+    SQLModel.metadata.create_all(connection)
+    add_user_team_id_index(connection)
+    for table_name in search_columns:
+        add_search_id(connection, table_name)
+        if dialect == "sqlite":
+            create_sqlite_search_index(connection, table_name)
+        elif dialect == "postgresql":
+            create_postgresql_search_index(connection, table_name)
+
+
+async def _main() -> None:
+    from adapter.sql.data_base import DatabaseManager
+    try:
+        await DatabaseManager.migrate()
+    finally:
+        await DatabaseManager.close_session()
+
+
+if __name__ == "__main__":
+    asyncio.run(_main())
@@ -1,10 +1,16 @@
 from typing import Optional
 from uuid import UUID, uuid4
-from datetime import datetime
+from datetime import datetime, timezone
 
 from pydantic import ConfigDict, EmailStr
 from sqlmodel import Field, SQLModel, String, Relationship
-from sqlalchemy import Column, DateTime, func
+from sqlalchemy import DDL, Column, DateTime, Index, event, func
+
+
+def utc_now() -> datetime:
+    # Set by Python rather than the database: SQLite's CURRENT_TIMESTAMP only
+    # has second precision, too coarse for updated_at to version a record
+    return datetime.now(timezone.utc)
 
 
 class ProjectUserLink(SQLModel, table=True):
@@ -16,24 +22,28 @@ class ProjectUserLink(SQLModel, table=True):
         default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     )
     updated_at: datetime | None = Field(
-        default=None, sa_column=Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+        default=None, sa_column=Column(DateTime(timezone=True), onupdate=utc_now, nullable=True)
     )
     role: Optional["ProjectRole"] = Relationship(back_populates="projects")
 
 
 class User(SQLModel, table=True):
     model_config = ConfigDict(extra='ignore')
+    __table_args__ = (Index("ix_user_name_id", "name", "id"),)  # keyset pagination
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str = Field(index=True)
     email: EmailStr = Field(sa_type=String, unique=True, index=True)
     location: str | None = Field(default=None)
-    team_id: UUID | None = Field(default=None, foreign_key="team.id", ondelete="SET NULL")
+    # Key of the SQLite search index, set by its insert trigger (see migrations.py)
+    search_id: int | None = Field(default=None, unique=True, index=True)
+    # Indexed: members of a team (relations, team versions) are read by it
+    team_id: UUID | None = Field(default=None, foreign_key="team.id", ondelete="SET NULL", index=True)
     created_at: datetime | None = Field(
         default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     )
     updated_at: datetime | None = Field(
-        default=None, sa_column=Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+        default=None, sa_column=Column(DateTime(timezone=True), onupdate=utc_now, nullable=True)
     )
     team: Optional["Team"] = Relationship(back_populates="users", sa_relationship_kwargs={"foreign_keys": "[User.team_id]"})
     manages: Optional["Team"] = Relationship(back_populates="manager", sa_relationship_kwargs={"foreign_keys": "[Team.manager_id]", "uselist": False})
@@ -42,6 +52,7 @@ class User(SQLModel, table=True):
 
 class Team(SQLModel, table=True):
     model_config = ConfigDict(extra='ignore')
+    __table_args__ = (Index("ix_team_name_id", "name", "id"),)  # keyset pagination
 
     id: UUID = Field(default_factory=uuid4, primary_key=True)
     name: str = Field(index=True, unique=True)
@@ -51,7 +62,7 @@ class Team(SQLModel, table=True):
         default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     )
     updated_at: datetime | None = Field(
-        default=None, sa_column=Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+        default=None, sa_column=Column(DateTime(timezone=True), onupdate=utc_now, nullable=True)
     )
     users: list[User] = Relationship(back_populates="team", sa_relationship_kwargs={"foreign_keys": "[User.team_id]"})
     manager: Optional[User] = Relationship(back_populates="manages", sa_relationship_kwargs={"foreign_keys": "[Team.manager_id]"})
@@ -67,7 +78,7 @@ class Project(SQLModel, table=True):
         default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     )
     updated_at: datetime | None = Field(
-        default=None, sa_column=Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+        default=None, sa_column=Column(DateTime(timezone=True), onupdate=utc_now, nullable=True)
     )
     users: list["User"] = Relationship(back_populates="projects", link_model=ProjectUserLink)
 
@@ -82,6 +93,42 @@ class ProjectRole(SQLModel, table=True):
         default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     )
     updated_at: datetime | None = Field(
-        default=None, sa_column=Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+        default=None, sa_column=Column(DateTime(timezone=True), onupdate=utc_now, nullable=True)
+    )
+    projects: list[ProjectUserLink] = Relationship(back_populates="role")
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Response stored for an Idempotency-Key; name is "<scope> <key>"."""
+    model_config = ConfigDict(extra='ignore')
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    name: str = Field(index=True, unique=True)
+    fingerprint: str
+    status_code: int
+    body: str
+    created_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    )
+    updated_at: datetime | None = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), onupdate=utc_now, nullable=True)
+    )
+
+
+# Columns matched by DbAccess.search_records, per table
+search_columns = {
+    "user": ("name", "email", "location"),
+}
+
+
+def search_document(table_name: str) -> str:
+    """SQL text of the searched document: the searchable columns joined by spaces."""
+    return " || ' ' || ".join(f"coalesce({column}, '')" for column in search_columns[table_name])
+
+
+# Created by adapter/sql/migrations.py; dropped with the table so drop_all leaves no stale index
+for _table_name in search_columns:
+    event.listen(
+        SQLModel.metadata.tables[_table_name], "before_drop",
+        DDL(f"DROP TABLE IF EXISTS {_table_name}_search").execute_if(dialect="sqlite"),
     )
-    projects: list[ProjectUserLink] = Relationship(back_populates="role")
\ No newline at end of file
@@ -0,0 +1,53 @@
+from typing import Callable, Hashable
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+
+class StatementCache:
+    """
+    Registry of the repository's query shapes. Each shape (table, filter,
+    order, projection...) is built once, with bind parameters where values go,
+    and reused by every later call: a query only binds values, instead of
+    rebuilding the select/where/options/order_by construct and having
+    SQLAlchemy regenerate its cache key from a fresh object graph.
+    """
+
+    def __init__(self):
+        self._statements: dict[Hashable, object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], object]):
+        statement = self._statements.get(key)
+        if statement is None:
+            self.misses += 1
+            statement = self._statements[key] = build()
+        else:
+            self.hits += 1
+        return statement
+
+    def clear(self) -> None:
+        self._statements.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._statements), "hits": self.hits, "misses": self.misses}
+
+
+statements = StatementCache()
+
+
+def _observe_lookups(options: CallbackOptions):
+    yield Observation(statements.hits, {"result": "hit"})
+    yield Observation(statements.misses, {"result": "miss"})
+
+
+meter = metrics.get_meter("adapter.sql.statements")
+meter.create_observable_counter(
+    "db.statement_cache.lookups",
+    callbacks=[_observe_lookups],
+    unit="{lookup}",
+    description="Repository statement lookups served from (hit) or added to (miss) the registry",
+)
@@ -1,9 +1,13 @@
 
+from typing import TYPE_CHECKING
+
+from config.settings import settings
 from ports.inbound.data_manager import DataManager
 from ports.repository.data_base import DbAccess
-from adapter.sql.data_access import DbAccessImpl
-from adapter.sql.data_base import DatabaseManager
-from core.data_manager.use_cases import DataManagerImpl, PublicCrud
+
+if TYPE_CHECKING:
+    from adapter.sql.data_base import DatabaseManager
+    from adapter.rest.idempotency import IdempotencyStore
 
 
 class DependencyContainer:
@@ -15,20 +19,52 @@ class DependencyContainer:
         return cls._instance
 
     def __init__(self):
-        self._db_manager: DatabaseManager | None = None
+        self._db_manager: "DatabaseManager | None" = None
         self._db_access: DbAccess | None = None
         self._data_manager: DataManager | None = None
         self._public_crud: DataManager | None = None
+        self._idempotency: "IdempotencyStore | None" = None
         self._initialized = False
 
-    def initialize(self) -> None:
+    def initialize(self, entity_cache: bool | None = None) -> None:
         if self._initialized:
             return
+        if entity_cache is None:
+            entity_cache = settings.ENTITY_CACHE_ENABLED
+        # Imported here, not with the module: SQLModel and the models are only
+        # loaded by the processes that build the container
+        from adapter.sql.data_access import DbAccessImpl
+        from adapter.sql.data_base import DatabaseManager
+        from adapter.rest.idempotency import IdempotencyStore
+        from core.data_manager.use_cases import DataManagerImpl, PublicCrud
+
         # Data layer
         self._db_manager = DatabaseManager
-        self._db_access = DbAccessImpl(db_manager=self._db_manager)
+        self._db_access = DbAccessImpl(
+            db_manager=self._db_manager,
+            lookup_window_seconds=settings.LOOKUP_BATCH_WINDOW_SECONDS,
+            count_ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+            coalesce_window_seconds=(
+                settings.WRITE_COALESCING_WINDOW_SECONDS if settings.WRITE_COALESCING_ENABLED else None
+            ),
+            coalesce_max_batch_size=settings.WRITE_COALESCING_MAX_BATCH,
+        )
+        if entity_cache:
+            from adapter.sql.cache import CachedDbAccess
+
+            self._db_access = CachedDbAccess(
+                repository=self._db_access,
+                max_entries=settings.ENTITY_CACHE_MAX_ENTRIES,
+                ttl_seconds=settings.ENTITY_CACHE_TTL_SECONDS,
+            )
         self._data_manager = DataManagerImpl(repository=self._db_access)
         self._public_crud = PublicCrud(data_manager=self._data_manager)
+        # REST layer
+        self._idempotency = IdempotencyStore(
+            repository=self._db_access if settings.IDEMPOTENCY_DURABLE else None,
+            max_entries=settings.IDEMPOTENCY_MAX_ENTRIES,
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        )
 
         self._initialized = True
 
@@ -36,11 +72,12 @@ class DependencyContainer:
         self._db_access = None
         self._data_manager = None
         self._public_crud = None
+        self._idempotency = None
         self._permission_checker = None
         self._authorization_use_case = None
         self._initialized = False
 
-    def db_manager(self) -> DatabaseManager:
+    def db_manager(self) -> "DatabaseManager":
         if self._db_manager is None:
             raise RuntimeError("Dependencies not initialized. Call container.initialize() first.")
         return self._db_manager
@@ -60,4 +97,9 @@ class DependencyContainer:
             raise RuntimeError("Dependencies not initialized. Call container.initialize() first.")
         return self._public_crud
 
+    def idempotency(self) -> "IdempotencyStore":
+        if self._idempotency is None:
+            raise RuntimeError("Dependencies not initialized. Call container.initialize() first.")
+        return self._idempotency
+
 container = DependencyContainer()
@@ -0,0 +1,119 @@
+"""
+Trace sampling configured by Settings (TRACE_SAMPLE_*).
+Imported by setup_telemetry only: it needs the OpenTelemetry SDK.
+"""
+
+from opentelemetry.sdk.trace import ReadableSpan, SpanProcessor
+from opentelemetry.sdk.trace.sampling import (
+    Decision, ParentBased, Sampler, SamplingResult, TraceIdRatioBased
+)
+from opentelemetry.trace import SpanContext, SpanKind, StatusCode, TraceFlags
+
+from config.settings import Settings
+
+
+class RouteRatioSampler(Sampler):
+    """
+    Root sampler: TraceIdRatioBased with the ratio of the first
+    TRACE_SAMPLE_RULES rule matching the span's HTTP method and route,
+    otherwise TRACE_SAMPLE_RATIO. The settings are read again whenever they
+    changed, so assigning them (see reload_trace_sampling) applies to the
+    next trace.
+
+    With TRACE_SAMPLE_ERRORS, a server span left out is still recorded
+    (not sampled: its children are dropped) for ErrorSpanProcessor to
+    export if it ends with an error. Recording it costs nearly as much as
+    sampling it, so low ratios save little with it on.
+    """
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self._state = None
+
+    def _current(self) -> tuple:
+        settings = self._settings
+        source = (settings.TRACE_SAMPLE_RATIO, settings.TRACE_SAMPLE_RULES, settings.TRACE_SAMPLE_ERRORS)
+        state = self._state
+        if state is None or state[0] != source:
+            rules = [
+                (method, route, TraceIdRatioBased(ratio))
+                for method, route, ratio in settings.trace_sample_rules()
+            ]
+            # Replaced at once: concurrent callers see the old or the new rules
+            state = self._state = (source, rules, TraceIdRatioBased(settings.TRACE_SAMPLE_RATIO))
+        return state
+
+    def sampler_for(self, method: str | None, route: str | None) -> TraceIdRatioBased:
+        _, rules, default = self._current()
+        for rule_method, rule_route, sampler in rules:
+            if rule_method in ("*", method) and rule_route in ("*", route):
+                return sampler
+        return default
+
+    def should_sample(
+        self,
+        parent_context,
+        trace_id: int,
+        name: str,
+        kind: SpanKind | None = None,
+        attributes=None,
+        links=None,
+        trace_state=None,
+    ) -> SamplingResult:
+        attributes = attributes or {}
+        sampler = self.sampler_for(
+            attributes.get("http.request.method") or attributes.get("http.method"),
+            attributes.get("http.route"),
+        )
+        result = sampler.should_sample(parent_context, trace_id, name, kind, attributes, links, trace_state)
+        if result.decision is Decision.DROP and kind is SpanKind.SERVER and self._settings.TRACE_SAMPLE_ERRORS:
+            return SamplingResult(Decision.RECORD_ONLY, attributes, result.trace_state)
+        return result
+
+    def get_description(self) -> str:
+        source, _, _ = self._current()
+        return f"RouteRatioSampler{{ratio={source[0]}, rules={source[1]!r}, errors={source[2]}}}"
+
+
+class ErrorSpanProcessor(SpanProcessor):
+    """
+    Hands spans that were recorded without being sampled and ended with an
+    error status to ``processor`` (its exporter only takes sampled spans),
+    marked sampled. ``processor`` is registered on its own: this one does
+    not flush or shut it down.
+    """
+
+    def __init__(self, processor: SpanProcessor):
+        self._processor = processor
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context is None or span.context.trace_flags.sampled:
+            return
+        if span.status.status_code is not StatusCode.ERROR:
+            return
+        context = span.context
+        self._processor.on_end(ReadableSpan(
+            name=span.name,
+            context=SpanContext(
+                context.trace_id, context.span_id, context.is_remote,
+                TraceFlags(TraceFlags.SAMPLED), context.trace_state,
+            ),
+            parent=span.parent,
+            resource=span.resource,
+            attributes=span.attributes,
+            events=span.events,
+            links=span.links,
+            kind=span.kind,
+            status=span.status,
+            start_time=span.start_time,
+            end_time=span.end_time,
+            instrumentation_scope=span.instrumentation_scope,
+        ))
+
+
+def build_sampler(settings: Settings) -> Sampler:
+    """
+    Follow the caller's decision when the request carries a trace context
+    (traceparent), otherwise sample by route.
+    """
+    return ParentBased(root=RouteRatioSampler(settings))
@@ -1,59 +1,276 @@
 """
 OpenTelemetry configuration and setup.
 Provides telemetry initialization and cleanup for the application.
+
+Only the OpenTelemetry API is imported with this module: the SDK, the OTLP
+exporters and the instrumentations are imported by the functions using
+them, so importing the app (the server's supervisor, every new worker) does
+not pay for them before they are needed.
 """
 
-from opentelemetry import trace
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor
-from opentelemetry.sdk.resources import Resource
-from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
-from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
-from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+import signal
+import threading
+from time import perf_counter, time
+
+from opentelemetry import trace, metrics
+from opentelemetry.metrics import CallbackOptions, Observation
 
-from config.settings import settings
+from config.settings import Settings, settings
 
 def setup_telemetry() -> None:
     """
-    Initialize OpenTelemetry tracing with OTLP exporter.
-    Exports traces to Alloy collector via OTLP HTTP.
+    Initialize OpenTelemetry tracing and metrics with OTLP exporters.
+    Exports traces and metrics to Alloy collector via OTLP HTTP.
+    Without OTEL_EXPORTER_OTLP_ENDPOINT nothing is exported: the SDK is not
+    even loaded and the API stays no-op.
+    Traces are sampled per route (TRACE_SAMPLE_*, see config.sampling);
+    SIGHUP reloads those settings (reload_trace_sampling).
     """
+    if not settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+
+    from config.sampling import ErrorSpanProcessor, build_sampler
+
     resource = Resource.create({
         "service.name": "fastapi-service",
         "service.version": "1.0.0",
         "deployment.environment": settings.ENVIRONMENT,
     })
-    tracer_provider = TracerProvider(resource=resource)
+    tracer_provider = TracerProvider(resource=resource, sampler=build_sampler(settings))
 
     otlp_endpoint = settings.OTEL_EXPORTER_OTLP_ENDPOINT
     span_processor = BatchSpanProcessor(
         OTLPSpanExporter(endpoint=f"{otlp_endpoint}/v1/traces")
     )
     tracer_provider.add_span_processor(span_processor)
+    tracer_provider.add_span_processor(ErrorSpanProcessor(span_processor))
     trace.set_tracer_provider(tracer_provider)
+    if hasattr(signal, "SIGHUP") and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGHUP, lambda signum, frame: reload_trace_sampling())
+
+    metric_reader = PeriodicExportingMetricReader(
+        OTLPMetricExporter(endpoint=f"{otlp_endpoint}/v1/metrics")
+    )
+    metrics.set_meter_provider(build_meter_provider([metric_reader], resource))
 
     instrument_sqlalchemy()
 
 
+# Request duration buckets (http.server.duration is in ms): dense below
+# 100 ms, where the reads are, then up to the 10 s request timeout
+HTTP_DURATION_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 75, 100, 250, 500, 1000, 2500, 5000, 10000)
+# RED dimensions: the route template (http.target holds it), method and
+# status. The instrumentation adds host and server names, dropped here
+HTTP_DURATION_ATTRIBUTES = {"http.method", "http.target", "http.status_code"}
+# Same with OTEL_SEMCONV_STABILITY_OPT_IN=http (http.server.request.duration, in s)
+HTTP_REQUEST_DURATION_ATTRIBUTES = {
+    "http.request.method", "http.route", "http.response.status_code", "error.type",
+}
+
+
+def build_meter_provider(metric_readers: list, resource=None):
+    """
+    MeterProvider of the service: explicit buckets and RED attributes for
+    the HTTP server duration histograms, and exemplars (trace and span ids)
+    on measurements made in a sampled span, linking a bucket or a counter
+    to traces in the backend.
+    """
+    from opentelemetry.sdk.metrics import MeterProvider, TraceBasedExemplarFilter
+    from opentelemetry.sdk.metrics.view import ExplicitBucketHistogramAggregation, View
+
+    views = [
+        View(
+            instrument_name="http.server.duration",
+            attribute_keys=HTTP_DURATION_ATTRIBUTES,
+            aggregation=ExplicitBucketHistogramAggregation(HTTP_DURATION_BUCKETS_MS),
+        ),
+        View(
+            instrument_name="http.server.request.duration",
+            attribute_keys=HTTP_REQUEST_DURATION_ATTRIBUTES,
+            aggregation=ExplicitBucketHistogramAggregation(
+                [bound / 1000 for bound in HTTP_DURATION_BUCKETS_MS]
+            ),
+        ),
+    ]
+    return MeterProvider(
+        metric_readers=metric_readers,
+        resource=resource,
+        views=views,
+        exemplar_filter=TraceBasedExemplarFilter(),
+    )
+
+
+def reload_trace_sampling() -> None:
+    """
+    Read the TRACE_SAMPLE_* settings again (the process environment, then
+    .env); the sampler applies them from the next trace. A malformed value
+    raises and leaves the current ones in place.
+    """
+    fresh = Settings()
+    settings.TRACE_SAMPLE_RATIO = fresh.TRACE_SAMPLE_RATIO
+    settings.TRACE_SAMPLE_RULES = fresh.TRACE_SAMPLE_RULES
+    settings.TRACE_SAMPLE_ERRORS = fresh.TRACE_SAMPLE_ERRORS
+
+
 def instrument_sqlalchemy() -> None:
     """
     Instrument SQLAlchemy for automatic DB operation tracing.
     """
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
     SQLAlchemyInstrumentor().instrument(
         enable_commenter=True,
         commenter_options={"db_driver": True}
     )
 
+# Connection pool metrics (OTel database client semantic conventions).
+# Instruments come from the global meter: they report once setup_telemetry
+# installs the MeterProvider.
+db_meter = metrics.get_meter("fastapi-service.db.pool")
+_db_pools: dict = {}  # pool name -> current pool of the engine using it
+
+
+def _observe_connections(options: CallbackOptions):
+    for name, pool in list(_db_pools.items()):
+        if hasattr(pool, "checkedout"):
+            yield Observation(pool.checkedout(), {"db.client.connection.pool.name": name, "db.client.connection.state": "used"})
+            yield Observation(pool.checkedin(), {"db.client.connection.pool.name": name, "db.client.connection.state": "idle"})
+
+
+def _observe_overflow(options: CallbackOptions):
+    # QueuePool.overflow() is negative until pool_size connections exist
+    for name, pool in list(_db_pools.items()):
+        if hasattr(pool, "overflow"):
+            yield Observation(max(pool.overflow(), 0), {"db.client.connection.pool.name": name})
+
+
+db_meter.create_observable_up_down_counter(
+    "db.client.connection.count",
+    callbacks=[_observe_connections],
+    unit="{connection}",
+    description="Connections currently checked out (used) or idle in the pool",
+)
+db_meter.create_observable_up_down_counter(
+    "db.client.connection.overflow",
+    callbacks=[_observe_overflow],
+    unit="{connection}",
+    description="Connections open beyond pool_size (max_overflow budget in use)",
+)
+db_wait_time = db_meter.create_histogram(
+    "db.client.connection.wait_time",
+    unit="s",
+    description="Time spent waiting to check a connection out of the pool",
+)
+db_create_time = db_meter.create_histogram(
+    "db.client.connection.create_time",
+    unit="s",
+    description="Time taken to open a new database connection",
+)
+db_timeouts = db_meter.create_counter(
+    "db.client.connection.timeouts",
+    unit="{timeout}",
+    description="Checkouts that gave up after pool_timeout",
+)
+db_pre_ping_failures = db_meter.create_counter(
+    "db.client.connection.pre_ping_failures",
+    unit="{failure}",
+    description="pool_pre_ping checks that found a dead connection",
+)
+db_recycles = db_meter.create_counter(
+    "db.client.connection.recycles",
+    unit="{connection}",
+    description="Connections replaced on checkout: older than pool_recycle, or invalidated",
+)
+
+
+def _instrument_pool(pool, attributes: dict) -> None:
+    from weakref import WeakSet
+    from sqlalchemy import event
+    from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+    # The pool has no "checkout started" event: time its public connect(),
+    # which Engine.raw_connection calls (waiting, pre-ping, new connection)
+    pool_connect = pool.connect
+
+    def timed_connect():
+        started = perf_counter()
+        try:
+            return pool_connect()
+        except PoolTimeoutError:
+            db_timeouts.add(1, attributes)
+            raise
+        finally:
+            db_wait_time.record(perf_counter() - started, attributes)
+
+    pool.connect = timed_connect
+
+    # A connection record opens a connection again only after replacing its
+    # old one: past pool_recycle, or after an invalidate / soft_invalidate
+    connected = WeakSet()
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        db_create_time.record(time() - connection_record.starttime, attributes)
+        if connection_record in connected:
+            db_recycles.add(1, attributes)
+        connected.add(connection_record)
+
+
+def instrument_db_pool(engine, pool_name: str) -> None:
+    """
+    Record connection pool metrics for an AsyncEngine through SQLAlchemy pool events.
+    """
+    from sqlalchemy import event
+
+    sync_engine = engine.sync_engine
+    attributes = {"db.client.connection.pool.name": pool_name}
+    _db_pools[pool_name] = sync_engine.pool
+    _instrument_pool(sync_engine.pool, attributes)
+
+    @event.listens_for(sync_engine, "engine_disposed")
+    def on_disposed(disposed_engine):
+        # dispose() replaces the pool
+        _db_pools[pool_name] = disposed_engine.pool
+        _instrument_pool(disposed_engine.pool, attributes)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def on_error(context):
+        if context.is_pre_ping:
+            db_pre_ping_failures.add(1, attributes)
+
+
 def instrument_app(app) -> None:
     """
     Instrument FastAPI application for automatic HTTP request tracing.
+    The instrumentation is imported and applied when the app builds its
+    middleware stack, on its first ASGI call (the lifespan startup).
     """
-    FastAPIInstrumentor.instrument_app(app)
+    build_middleware_stack = app.build_middleware_stack
+
+    def instrumented_build_middleware_stack():
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+        app.build_middleware_stack = build_middleware_stack
+        FastAPIInstrumentor.instrument_app(app)
+        return app.build_middleware_stack()
+
+    app.build_middleware_stack = instrumented_build_middleware_stack
 
 
 def shutdown_telemetry() -> None:
     """
     Cleanup OpenTelemetry resources.
     """
+    if not settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
     SQLAlchemyInstrumentor().uninstrument()
     trace.get_tracer_provider().shutdown()
+    metrics.get_meter_provider().shutdown()
@@ -1,5 +1,39 @@
+import asyncio
 from functools import wraps
 
+from opentelemetry import metrics
+
+
+meter = metrics.get_meter("core.data_manager")
+operation_counter = meter.create_counter(
+    "data_manager.operations",
+    unit="{operation}",
+    description="DataManagerImpl.process calls by operation, entity and error type (failures only)",
+)
+
+
+def metrics_helper(func):
+    """
+    Count every call by operation and entity, with the exception's type as
+    ``error.type`` when it fails. Counted in the caller's span context: a
+    sampled request's trace id becomes the exemplar.
+    """
+    @wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        attributes = {
+            "data_manager.operation": str(kwargs.get("operation")),
+            "data_manager.entity": str(kwargs.get("entity")),
+        }
+        try:
+            result = await func(self, *args, **kwargs)
+        except Exception as error:
+            operation_counter.add(1, {**attributes, "error.type": type(error).__name__})
+            raise
+        operation_counter.add(1, attributes)
+        return result
+
+    return wrapper
+
 
 def validation_helper(func):
     @wraps(func)
@@ -13,9 +47,10 @@ def validation_helper(func):
 
             case ['DataManagerImpl', 'process', 'create', 'users']:
                 if kwargs.get("team_name"):
-                    record = await self.db.read_record(
+                    record = await self.db.lookup_record(
                         table_id = "teams",
-                        record_name = kwargs.get("team_name")
+                        field = "name",
+                        value = kwargs.get("team_name")
                     )
                     if not record:
                         raise ValueError(
@@ -25,19 +60,59 @@ def validation_helper(func):
 
             case ['DataManagerImpl', 'process', 'create', 'teams']:
                 if kwargs.get("manager_email"):
-                    async with self.db.query_records() as query:
-                        user = await (
-                            query
-                            .select(query.table["users"])
-                            .where(query.table["users"].email == kwargs.get("manager_email"))
-                            .first()
-                        )
+                    user = await self.db.lookup_record(
+                        table_id = "users",
+                        field = "email",
+                        value = kwargs.get("manager_email")
+                    )
                     if not user:
                         raise ValueError(
                             f"User with email '{kwargs.get('manager_email')}' does not exist."
                         )
                     kwargs["manager_id"] = user.id
 
+            case ['DataManagerImpl', 'process', 'batch_create', 'users']:
+                kwargs["records"] = await _resolve_batch_references(
+                    self.db, kwargs.get("records", []),
+                    ref_key="team_name", fk_key="team_id",
+                    table_id="teams", column="name",
+                    error="Team with name '{}' does not exist."
+                )
+
+            case ['DataManagerImpl', 'process', 'batch_create', 'teams']:
+                kwargs["records"] = await _resolve_batch_references(
+                    self.db, kwargs.get("records", []),
+                    ref_key="manager_email", fk_key="manager_id",
+                    table_id="users", column="email",
+                    error="User with email '{}' does not exist."
+                )
+
         return await func(self, *args, **kwargs)
 
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+async def _resolve_batch_references(db, records, ref_key, fk_key, table_id, column, error):
+    """
+    Resolve the natural-key references of a whole batch. The lookups run
+    concurrently, so the repository batches them into one ``IN (...)`` query.
+    Records whose reference does not exist are replaced by a ValueError so the
+    caller can report them per item.
+    """
+    keys = list({record[ref_key] for record in records if record.get(ref_key)})
+    if not keys:
+        return records
+    found = await asyncio.gather(*(
+        db.lookup_record(table_id=table_id, field=column, value=key) for key in keys
+    ))
+    ids = {key: rec.id for key, rec in zip(keys, found) if rec is not None}
+
+    resolved = []
+    for record in records:
+        ref = record.get(ref_key)
+        if not ref:
+            resolved.append(record)
+        elif ref in ids:
+            resolved.append({**record, fk_key: ids[ref]})
+        else:
+            resolved.append(ValueError(error.format(ref)))
+    return resolved
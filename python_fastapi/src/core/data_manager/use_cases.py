@@ -1,6 +1,8 @@
+from pydantic import ValidationError
+
 from ports.inbound.data_manager import DataManager
 from ports.repository.data_base import DbAccess
-from core.data_manager.data_helper import validation_helper
+from core.data_manager.data_helper import metrics_helper, validation_helper
 from core.data_manager.data_domain import (
     UserEntity, TeamEntity, ProjectEntity,
     ProjectRoleEntity, StartedProjectEntity
@@ -18,6 +20,10 @@ class DataManagerImpl(DataManager):
             "started_projects": StartedProjectEntity,
         }
 
+    def unit_of_work(self):
+        return self.db.unit_of_work()
+
+    @metrics_helper
     @validation_helper
     async def process(self, operation: str, entity: str, **kwargs):
         if (
@@ -34,6 +40,29 @@ class DataManagerImpl(DataManager):
             )
             return record
 
+        elif operation == "batch_create":
+            # Results keep the input order: a created record or the error for that item
+            results: list = []
+            pending: list[tuple[int, dict]] = []
+            for index, item in enumerate(kwargs.get("records", [])):
+                if isinstance(item, ValueError):
+                    results.append(item)
+                    continue
+                results.append(None)
+                try:
+                    attributes = self.entities[entity](**item)
+                    pending.append((index, attributes.model_dump(exclude_none=True)))
+                except ValidationError as error:
+                    results[index] = ValueError(f"Error occurred: {error}")
+            if pending:
+                records = await self.db.create_records(
+                    table_id = entity,
+                    rows = [attributes for _, attributes in pending]
+                )
+                for (index, _), record in zip(pending, records):
+                    results[index] = record
+            return results
+
         elif operation == "read":
             record = await self.db.read_record(
                 table_id = entity,
@@ -42,18 +71,54 @@ class DataManagerImpl(DataManager):
                 offset = kwargs.get("offset", None),
                 limit = kwargs.get("limit", None),
                 order = kwargs.get("order", "asc"),
+                after = kwargs.get("after", None),
+                columns = kwargs.get("columns", None),
+                relations = kwargs.get("relations", None),
             )
             return record
 
+        elif operation == "search":
+            return await self.db.search_records(
+                table_id = entity,
+                query = kwargs.get("query", ""),
+                limit = kwargs.get("limit", None),
+                after = kwargs.get("after", None),
+                columns = kwargs.get("columns", None),
+            )
+
+        elif operation == "count":
+            return await self.db.count_records(
+                table_id = entity,
+                exact = kwargs.get("exact", False),
+            )
+
+        elif operation == "version":
+            return await self.db.read_version(
+                table_id = entity,
+                record_name = kwargs.get("record_name", None),
+                record_id = kwargs.get("record_id", None),
+            )
+
+        elif operation == "export":
+            # Async iterator of row batches, consumed after the request's unit of work
+            return self.db.stream_records(
+                table_id = entity,
+                columns = kwargs.get("columns", None),
+                batch_size = kwargs.get("batch_size", 1000),
+            )
+
 class PublicCrud():
     def __init__(self, data_manager: DataManager):
         self._proxy_to = data_manager
 
+    def unit_of_work(self):
+        return self._proxy_to.unit_of_work()
+
     def __getattr__(self, name):
         async def filter(*args, **kwargs):
             if kwargs["entity"] not in ["users", "teams", "projects"]:
                 return None
-            if kwargs["operation"] not in ["create", "read", "update", "delete"]:
+            if kwargs["operation"] not in ["create", "batch_create", "read", "search", "count", "version", "export", "update", "delete"]:
                 return None
             return await getattr(self._proxy_to, name)(*args, **kwargs)
         return filter
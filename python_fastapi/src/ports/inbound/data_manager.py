@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
 
 class DataManager(ABC):
+    @abstractmethod
+    def unit_of_work(self): ...
+
     @abstractmethod
     async def process(
         self,
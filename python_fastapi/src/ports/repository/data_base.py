@@ -3,6 +3,12 @@ from abc import ABC, abstractmethod
 
 
 class DbAccess(ABC):
+    @abstractmethod
+    def unit_of_work(self): ...
+
+    @abstractmethod
+    def after_commit(self, callback): ...
+
     @abstractmethod
     async def query_records(self): ...
 
@@ -13,6 +19,13 @@ class DbAccess(ABC):
         attributes: dict
         ): ...
 
+    @abstractmethod
+    async def create_records(
+        self,
+        table_id: str,
+        rows: list[dict]
+        ): ...
+
     @abstractmethod
     async def read_record(
         self,
@@ -22,6 +35,50 @@ class DbAccess(ABC):
         offset: int | None = None,
         limit: int | None = None,
         order: str | None = None,
+        after: tuple | None = None,
+        columns: tuple[str, ...] | None = None,
+        relations: dict | None = None,
+        ): ...
+
+    @abstractmethod
+    async def read_version(
+        self,
+        table_id: str,
+        record_name: str | None = None,
+        record_id: UUID | None = None,
+        ): ...
+
+    @abstractmethod
+    async def search_records(
+        self,
+        table_id: str,
+        query: str,
+        limit: int | None = None,
+        after: tuple | None = None,
+        columns: tuple[str, ...] | None = None,
+        ): ...
+
+    @abstractmethod
+    async def count_records(
+        self,
+        table_id: str,
+        exact: bool = False
+        ): ...
+
+    @abstractmethod
+    async def lookup_record(
+        self,
+        table_id: str,
+        field: str,
+        value
+        ): ...
+
+    @abstractmethod
+    def stream_records(
+        self,
+        table_id: str,
+        columns: tuple[str, ...] | None = None,
+        batch_size: int = 1000,
         ): ...
 
     @abstractmethod
@@ -8,12 +8,15 @@ from asgi_lifespan import LifespanManager
 from httpx import AsyncClient, ASGITransport
 from fastapi import FastAPI
 from pytest import fixture
+from opentelemetry import metrics
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
 
 from adapter.sql.models import User, Team
 from adapter.sql.data_base import DatabaseManager
 from adapter.rest.server import web_app
 from config.container import container
 from config.settings import settings
+from config.telemetry import build_meter_provider
 
 
 settings.ENVIRONMENT = "test"
@@ -36,6 +39,14 @@ async def fastapi_client():
         async with AsyncClient(transport=transport, base_url="http://test") as client:
             yield client
 
+@fixture(scope="session")
+def metric_reader():
+    # The global MeterProvider can only be set once per process
+    # The service's pipeline, with the in-memory reader standing in for the collector
+    reader = InMemoryMetricReader()
+    metrics.set_meter_provider(build_meter_provider([reader]))
+    return reader
+
 @fixture()
 def db_tables():
     return {
@@ -264,3 +264,389 @@ async def test_read_team_with_users(fastapi_client, sample_teams_data, sample_us
     data = response.json()
     assert data["id"] == team_id
     assert "users" in data
+
+
+@mark.anyio
+async def test_create_users_batch(fastapi_client, sample_teams_data, sample_users_data):
+    team_data = sample_teams_data["valid_values"][0]  # engineering
+    team_response = await fastapi_client.post("/teams", json=team_data)
+    assert team_response.status_code == 201
+    team_id = team_response.json()["record_id"]
+
+    records = [
+        sample_users_data["valid_values"][0],  # alice (no team)
+        sample_users_data["valid_values"][1],  # bob (engineering)
+        sample_users_data["valid_values"][2],  # charlie (marketing, does not exist)
+        {"name": "alice_again", "email": "alice@example.com"},  # duplicate email
+        sample_users_data["valid_values"][3],  # diana (no team)
+    ]
+    response = await fastapi_client.post("/users:batch", json={"records": records})
+    assert response.status_code == 201
+
+    data = response.json()
+    assert data["created"] == 3
+    assert data["failed"] == 2
+    assert [item["index"] for item in data["results"]] == [0, 1, 2, 3, 4]
+    assert [item["record_name"] for item in data["results"]] == [
+        "alice", "bob", None, None, "diana"
+    ]
+    assert "marketing" in data["results"][2]["error"]
+    assert data["results"][3]["error"] is not None
+
+    bob_id = data["results"][1]["record_id"]
+    read_response = await fastapi_client.get(f"/users/{bob_id}")
+    assert read_response.status_code == 200
+    assert read_response.json()["team_id"] == team_id
+
+    response = await fastapi_client.get("/users")
+    assert len(response.json()) == 3
+
+
+@mark.anyio
+async def test_create_teams_batch(fastapi_client, sample_teams_data):
+    response = await fastapi_client.post(
+        "/teams:batch",
+        json={"records": sample_teams_data["valid_values"]}
+    )
+    assert response.status_code == 201
+
+    data = response.json()
+    assert data["created"] == len(sample_teams_data["valid_values"])
+    assert data["failed"] == 0
+    assert [item["record_name"] for item in data["results"]] == [
+        team["name"] for team in sample_teams_data["valid_values"]
+    ]
+
+    response = await fastapi_client.post("/teams:batch", json={"records": []})
+    assert response.status_code == 422
+
+
+@mark.anyio
+async def test_read_all_users_cursor_paginated(fastapi_client):
+    # Duplicate names: the id tie-breaker must keep pages from overlapping
+    users = [
+        {"name": "same", "email": "same1@example.com"},
+        {"name": "same", "email": "same2@example.com"},
+        {"name": "same", "email": "same3@example.com"},
+        {"name": "zed", "email": "zed@example.com"},
+    ]
+    response = await fastapi_client.post("/users:batch", json={"records": users})
+    assert response.json()["created"] == len(users)
+
+    for order in ("asc", "desc"):
+        response = await fastapi_client.get(f"/users?limit=3&order={order}")
+        assert response.status_code == 200
+        full_page = [user["id"] for user in response.json()]
+
+        seen = []
+        response = await fastapi_client.get(f"/users?limit=1&order={order}")
+        while True:
+            assert response.status_code == 200
+            seen.extend(user["id"] for user in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+            response = await fastapi_client.get(f"/users?limit=1&cursor={cursor}")
+
+        assert len(seen) == len(users)
+        assert len(set(seen)) == len(users)
+        assert seen[:3] == full_page
+
+    response = await fastapi_client.get("/users?cursor=not-a-cursor")
+    assert response.status_code == 400
+
+    response = await fastapi_client.get(f"/users?offset=1&cursor={cursor or 'x'}")
+    assert response.status_code == 400
+
+
+@mark.anyio
+async def test_request_uses_one_connection(fastapi_client, sample_teams_data, sample_users_data):
+    from sqlalchemy import event
+    from config.container import container
+
+    team_response = await fastapi_client.post("/teams", json=sample_teams_data["valid_values"][0])
+    assert team_response.status_code == 201
+
+    checkouts = []
+    engine = container.db_manager().get_engine().sync_engine
+    listener = lambda *args: checkouts.append(args)
+    event.listen(engine, "checkout", listener)
+    try:
+        # Team lookup in validation_helper + insert share the request's session
+        user_data = sample_users_data["valid_values"][1]  # bob (engineering)
+        response = await fastapi_client.post("/users", json=user_data)
+        assert response.status_code == 201
+    finally:
+        event.remove(engine, "checkout", listener)
+
+    assert len(checkouts) == 1
+
+    read_response = await fastapi_client.get(f"/users/{response.json()['record_id']}")
+    assert read_response.json()["team_id"] == team_response.json()["record_id"]
+
+
+@mark.anyio
+async def test_export_users_ndjson(fastapi_client):
+    import orjson
+
+    users = [{"name": f"user{i}", "email": f"user{i}@example.com"} for i in range(25)]
+    response = await fastapi_client.post("/users:batch", json={"records": users})
+    assert response.json()["created"] == len(users)
+
+    async with fastapi_client.stream("GET", "/export/users") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [orjson.loads(line) async for line in response.aiter_lines() if line]
+
+    assert sorted(line["email"] for line in lines) == sorted(user["email"] for user in users)
+    assert set(lines[0]) == {"id", "name", "email", "location", "team_id"}
+
+    response = await fastapi_client.get("/export/project_roles")
+    assert response.status_code == 422
+
+
+@mark.anyio
+async def test_read_teams_expand_members(fastapi_client):
+    response = await fastapi_client.post("/teams:batch", json={"records": [{"name": "big"}, {"name": "small"}]})
+    assert response.json()["created"] == 2
+    users = [{"name": f"user{i}", "email": f"user{i}@example.com", "team_name": "big"} for i in range(4)]
+    response = await fastapi_client.post("/users:batch", json={"records": users})
+    assert response.json()["created"] == len(users)
+
+    response = await fastapi_client.get("/teams?members_limit=2")
+    assert response.status_code == 200
+    assert [len(team["users"]) for team in response.json()] == [2, 0]
+
+    response = await fastapi_client.get("/teams?expand=count")
+    assert [(team["users"], team["users_count"]) for team in response.json()] == [(None, 4), (None, 0)]
+
+    response = await fastapi_client.get("/teams?expand=none")
+    assert [(team["users"], team["users_count"]) for team in response.json()] == [(None, None), (None, None)]
+
+    team_id = response.json()[0]["id"]
+    response = await fastapi_client.get(f"/teams/{team_id}?expand=members&members_limit=3")
+    assert [user["name"] for user in response.json()["users"]] == ["user0", "user1", "user2"]
+
+    response = await fastapi_client.get("/teams?expand=all")
+    assert response.status_code == 422
+
+
+@mark.anyio
+async def test_read_users_json_fast_path(fastapi_client, sample_users_data):
+    from adapter.rest.dto import ReadUserResponse
+
+    users = [user for user in sample_users_data["valid_values"] if "team_name" not in user]
+    response = await fastapi_client.post("/users:batch", json={"records": users})
+    assert response.json()["created"] == len(users)
+
+    # Same body as validating every row through the response model
+    response = await fastapi_client.get("/users?limit=1")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "X-Next-Cursor" in response.headers
+    data = response.json()
+    assert data == [ReadUserResponse.model_validate(data[0]).model_dump(mode="json")]
+    assert list(data[0]) == list(ReadUserResponse.model_fields)
+
+    response = await fastapi_client.get(f"/users/{data[0]['id']}")
+    assert response.json() == data[0]
+
+    schema = (await fastapi_client.get("/openapi.json")).json()
+    for route in ("/users", "/users/{record_id}"):
+        content = schema["paths"][route]["get"]["responses"]["200"]["content"]["application/json"]
+        assert "ReadUserResponse" in str(content["schema"])
+
+
+@mark.anyio
+async def test_conditional_get(fastapi_client, sample_teams_data):
+    from uuid import UUID
+    from config.container import container
+
+    team_response = await fastapi_client.post("/teams", json=sample_teams_data["valid_values"][0])
+    team_id = team_response.json()["record_id"]
+    user_response = await fastapi_client.post("/users", json={"name": "ann", "email": "ann@example.com"})
+    user_id = user_response.json()["record_id"]
+
+    response = await fastapi_client.get(f"/users/{user_id}")
+    etag, last_modified = response.headers["ETag"], response.headers["Last-Modified"]
+    assert not etag.startswith("W/")
+
+    response = await fastapi_client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    response = await fastapi_client.get(f"/users/{user_id}", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+    await container.db_access().update_record(table_id="users", attributes={"id": UUID(user_id), "location": "Porto"})
+    response = await fastapi_client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["location"] == "Porto"
+    assert response.headers["ETag"] != etag
+
+    # A team's version follows its members
+    response = await fastapi_client.get(f"/teams/{team_id}")
+    team_etag = response.headers["ETag"]
+    assert (await fastapi_client.get(f"/teams/{team_id}", headers={"If-None-Match": team_etag})).status_code == 304
+    response = await fastapi_client.get(f"/teams/{team_id}?expand=count", headers={"If-None-Match": team_etag})
+    assert response.status_code == 200
+    await fastapi_client.post("/users", json={"name": "bo", "email": "bo@example.com", "team_name": "engineering"})
+    response = await fastapi_client.get(f"/teams/{team_id}", headers={"If-None-Match": team_etag})
+    assert response.status_code == 200
+    assert [user["name"] for user in response.json()["users"]] == ["bo"]
+
+    # Pages get a weak ETag over their content
+    response = await fastapi_client.get("/users")
+    page_etag = response.headers["ETag"]
+    assert page_etag.startswith("W/")
+    assert (await fastapi_client.get("/users", headers={"If-None-Match": page_etag})).status_code == 304
+    response = await fastapi_client.get("/teams")
+    assert (await fastapi_client.get("/teams", headers={"If-None-Match": response.headers["ETag"]})).status_code == 304
+    await fastapi_client.post("/users", json={"name": "cy", "email": "cy@example.com"})
+    assert (await fastapi_client.get("/users", headers={"If-None-Match": page_etag})).status_code == 200
+
+
+@mark.anyio
+async def test_search_users(fastapi_client):
+    users = [{"name": f"member{i}", "email": f"member{i}@example.com"} for i in range(5)]
+    users.append({"name": "outsider", "email": "out@example.org", "location": "Membertown"})
+    response = await fastapi_client.post("/users:batch", json={"records": users})
+    assert response.json()["created"] == len(users)
+
+    seen = []
+    response = await fastapi_client.get("/users/search?q=member&limit=4")
+    while True:
+        assert response.status_code == 200
+        seen.extend(user["name"] for user in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        response = await fastapi_client.get(f"/users/search?q=member&limit=4&cursor={cursor}")
+    assert sorted(seen) == sorted(user["name"] for user in users)
+    assert set(response.json()[0]) == {"id", "name", "email", "location", "team_id", "entity"}
+
+    assert (await fastapi_client.get("/users/search?q=example.org")).json()[0]["name"] == "outsider"
+    assert (await fastapi_client.get("/users/search?q=me")).status_code == 422
+    assert (await fastapi_client.get("/users/search?q=member&cursor=bad")).status_code == 400
+
+
+@mark.anyio
+async def test_list_total_count(fastapi_client, sample_teams_data):
+    from unittest.mock import patch
+    from adapter.sql.data_access import DbAccessImpl
+
+    response = await fastapi_client.post("/teams:batch", json={"records": sample_teams_data["valid_values"]})
+    assert response.json()["created"] == 3
+
+    response = await fastapi_client.get("/teams?limit=1")
+    assert "X-Total-Count" not in response.headers
+
+    response = await fastapi_client.get("/teams?limit=1&include_total=true")
+    assert response.headers["X-Total-Count"] == "3"
+
+    await fastapi_client.post("/teams", json={"name": "support"})
+    response = await fastapi_client.get("/users?include_total=true&total=exact")
+    assert response.headers["X-Total-Count"] == "0"
+    response = await fastapi_client.get("/teams?include_total=true&total=exact")
+    assert response.headers["X-Total-Count"] == "4"
+
+    # An unchanged page is answered without counting
+    with patch.object(DbAccessImpl, "count_records") as count_records:
+        response = await fastapi_client.get(
+            "/teams?include_total=true&total=exact", headers={"If-None-Match": response.headers["ETag"]}
+        )
+    assert response.status_code == 304
+    count_records.assert_not_called()
+
+    response = await fastapi_client.get("/teams?include_total=true&total=guess")
+    assert response.status_code == 422
+
+
+@mark.anyio
+async def test_create_idempotency_key(fastapi_client, sample_teams_data):
+    import asyncio
+
+    team_data = sample_teams_data["valid_values"][0]
+    headers = {"Idempotency-Key": "create-team-1"}
+    first = await fastapi_client.post("/teams", json=team_data, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    retry = await fastapi_client.post("/teams", json=team_data, headers=headers)
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+
+    # Same key, different request
+    response = await fastapi_client.post("/teams", json={"name": "other"}, headers=headers)
+    assert response.status_code == 422
+    # The key is scoped to the route
+    response = await fastapi_client.post("/users", json={"name": "other", "email": "o@example.com"}, headers=headers)
+    assert response.status_code == 201
+
+    # Concurrent duplicates: one create, the others wait and replay it
+    headers = {"Idempotency-Key": "create-team-2"}
+    responses = await asyncio.gather(*(
+        fastapi_client.post("/teams", json={"name": "support"}, headers=headers) for _ in range(5)
+    ))
+    assert {response.status_code for response in responses} == {201}
+    assert len({response.json()["record_id"] for response in responses}) == 1
+    assert sum("Idempotent-Replayed" in response.headers for response in responses) == 4
+
+    response = await fastapi_client.get("/teams?include_total=true&total=exact")
+    assert response.headers["X-Total-Count"] == "2"
+
+
+@mark.anyio
+async def test_conditional_get_entity_cache(fastapi_client):
+    from uuid import UUID
+    from config.container import container
+
+    container.reset()
+    container.initialize(entity_cache=True)
+    user_response = await fastapi_client.post("/users", json={"name": "cy", "email": "cy@example.com"})
+    user_id = user_response.json()["record_id"]
+    etag = (await fastapi_client.get(f"/users/{user_id}")).headers["ETag"]
+
+    # Changed by another worker: this one's entity cache still holds the old record
+    repository = container.db_access()._repository
+    await repository.update_record(table_id="users", attributes={"id": UUID(user_id), "location": "Lima"})
+    response = await fastapi_client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    # The validators describe the body served, not the newer version
+    assert response.json()["location"] is None
+    assert response.headers["ETag"] == etag
+
+    container.db_access().clear()
+    response = await fastapi_client.get(f"/users/{user_id}", headers={"If-None-Match": etag})
+    assert response.json()["location"] == "Lima"
+    assert response.headers["ETag"] != etag
+    fresh = response.headers["ETag"]
+    assert (await fastapi_client.get(f"/users/{user_id}", headers={"If-None-Match": fresh})).status_code == 304
+
+
+@mark.anyio
+async def test_request_duration_metrics(fastapi_client, metric_reader):
+    from config.telemetry import HTTP_DURATION_BUCKETS_MS
+
+    await fastapi_client.get("/teams/not-a-uuid")
+    await fastapi_client.get("/users?limit=5")
+
+    points = []
+    for resource_metrics in metric_reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                if metric.name in ("http.server.duration", "http.server.request.duration"):
+                    points.extend(metric.data.data_points)
+    durations = {
+        (
+            point.attributes.get("http.target") or point.attributes.get("http.route"),
+            point.attributes.get("http.status_code") or point.attributes.get("http.response.status_code"),
+        ): point
+        for point in points
+    }
+    # Per route template and status, without the host attributes
+    assert durations[("/users", 200)].count >= 1
+    assert durations[("/teams/{record_id}", 422)].count >= 1
+    assert "http.server_name" not in durations[("/users", 200)].attributes
+    assert len(durations[("/users", 200)].explicit_bounds) == len(HTTP_DURATION_BUCKETS_MS)
@@ -0,0 +1,108 @@
+import asyncio
+from os import path
+
+import pytest
+
+from adapter.sql.loader import BatchLoader
+from adapter.sql.data_access import DbAccessImpl
+from adapter.sql.data_base import DatabaseManager
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_collapses_concurrent_keys():
+    calls = []
+
+    async def batch_fn(keys, shared):
+        calls.append((sorted(keys), shared))
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    loader = BatchLoader(batch_fn, name="test")
+
+    results = await asyncio.gather(
+        loader.load("a"), loader.load("b"), loader.load("a"), loader.load("missing")
+    )
+    assert results == ["A", "B", "A", None]
+    assert calls == [(["a", "b", "missing"], True)]
+    assert loader.stats() == {"batches": 1, "keys": 3, "deduplicated": 1}
+
+    # A lone caller runs its own batch
+    assert await loader.load("c") == "C"
+    assert calls[-1] == (["c"], False)
+    # Shared batch tasks are kept referenced until they finish
+    assert loader._tasks == set()
+
+
+@pytest.mark.asyncio
+async def test_batch_loader_propagates_errors():
+    async def batch_fn(keys, shared):
+        raise ValueError("boom")
+
+    loader = BatchLoader(batch_fn, name="test", window_seconds=0.001)
+
+    results = await asyncio.gather(loader.load(1), loader.load(2), return_exceptions=True)
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_db_lookup_records_batched(
+    db_create_tables,
+    db_close,
+    sample_teams_data,
+    ):
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+
+    for team in sample_teams_data["valid_values"]:
+        await db_access.create_record(table_id="teams", attributes=team)
+    names = [team["name"] for team in sample_teams_data["valid_values"]]
+
+    teams = await asyncio.gather(*(
+        db_access.lookup_record(table_id="teams", field="name", value=name)
+        for name in [*names, names[0], "unknown"]
+    ))
+    assert [team.name for team in teams[:-1]] == [*names, names[0]]
+    assert teams[-1] is None
+    assert db_access._loaders[("teams", "name")].stats()["batches"] == 1
+
+    with pytest.raises(ValueError):
+        await db_access.lookup_record(table_id="users", field="name", value="alice")
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_create_records_coalesced(
+    db_create_tables,
+    db_close,
+    ):
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager, coalesce_window_seconds=0.001)
+
+    # One transaction for the burst; the duplicate only fails its own caller
+    names = [f"team{i}" for i in range(20)]
+    results = await asyncio.gather(*(
+        db_access.create_record(table_id="teams", attributes={"name": name})
+        for name in [*names, names[0]]
+    ), return_exceptions=True)
+    assert [team.name for team in results[:-1]] == names
+    assert all(team.created_at is not None for team in results[:-1])
+    assert isinstance(results[-1], ValueError)
+    assert db_access._coalescers["teams"].stats() == {"commits": 1, "writes": 21, "failures": 1}
+    assert len(await db_access.read_record(table_id="teams", limit=50)) == 20
+
+    # Creates in a unit of work stay in its transaction: a rollback discards them all
+    with pytest.raises(ValueError):
+        async with db_access.unit_of_work():
+            await db_access.create_record(table_id="users", attributes={"name": "alice", "email": "a@example.com"})
+            await db_access.create_record(table_id="teams", attributes={"name": "support"})
+            raise ValueError("rolled back")
+    assert await db_access.read_record(table_id="teams", record_name="support") is None
+    assert await db_access.read_record(table_id="users", record_name="alice") is None
+    assert "users" not in db_access._coalescers
+    assert db_access._coalescers["teams"].stats()["commits"] == 1
+
+    await db_close()
+
+    assert not path.exists("test.db")
@@ -150,4 +150,33 @@ async def test_pub_data_manager(
 
     await db_close()
 
-    assert not path.exists("test.db")
\ No newline at end of file
+    assert not path.exists("test.db")
+
+@pytest.mark.asyncio
+async def test_data_manager_operation_metrics(metric_reader):
+    from opentelemetry.sdk.trace import TracerProvider
+
+    mock_repo = Mock(spec=DbAccessImpl)
+    mock_repo.create_record = AsyncMock(return_value=Mock(id=uuid4(), name="metrics_team"))
+    data_manager = DataManagerImpl(repository=mock_repo)
+
+    tracer = TracerProvider().get_tracer("test")
+    with tracer.start_as_current_span("POST /teams") as span:
+        await data_manager.process(operation="create", entity="teams", name="metrics_team")
+    with pytest.raises(ValueError):
+        await data_manager.process(operation="read", entity="unknown")
+
+    points = {}
+    for resource_metrics in metric_reader.get_metrics_data().resource_metrics:
+        for scope_metrics in resource_metrics.scope_metrics:
+            for metric in scope_metrics.metrics:
+                if metric.name == "data_manager.operations":
+                    for point in metric.data.data_points:
+                        attributes = point.attributes
+                        key = (attributes["data_manager.operation"], attributes["data_manager.entity"])
+                        points[key] = point
+    created = points[("create", "teams")]
+    assert created.value >= 1 and "error.type" not in created.attributes
+    # The exemplar links the count to the sampled trace it was made in
+    assert span.get_span_context().trace_id in [exemplar.trace_id for exemplar in created.exemplars]
+    assert points[("read", "unknown")].attributes["error.type"] == "ValueError"
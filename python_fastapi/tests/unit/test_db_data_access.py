@@ -63,3 +63,453 @@ async def test_db_data_access(
     await db_close()
 
     assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_create_records(
+    db_create_tables,
+    db_close,
+    sample_teams_data,
+    ):
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    db_access.batch_chunk_size = 2
+
+    rows = [
+        *sample_teams_data["valid_values"],
+        sample_teams_data["valid_values"][0],  # duplicate unique name
+        sample_teams_data["invalid_attribute"][0],  # missing name
+    ]
+    results = await db_access.create_records(table_id="teams", rows=rows)
+
+    assert len(results) == len(rows)
+    for row, result in zip(sample_teams_data["valid_values"], results):
+        assert result.name == row["name"]
+    assert isinstance(results[3], ValueError)
+    assert isinstance(results[4], ValueError)
+
+    teams = await db_access.read_record(table_id="teams")
+    assert len(teams) == len(sample_teams_data["valid_values"])
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_update_delete_records(
+    db_create_tables,
+    db_close,
+    sample_teams_data,
+    sample_users_data,
+    ):
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+
+    team = await db_access.create_record(
+        table_id="teams",
+        attributes=sample_teams_data["valid_values"][0]
+    )
+    user = await db_access.create_record(
+        table_id="users",
+        attributes={**sample_users_data["valid_values"][0], "team_id": team.id}
+    )
+
+    # UPDATE ... RETURNING by id and by unique name
+    assert db_access._returning_fast_path("update", "teams", team.id)
+    updated = await db_access.update_record(
+        table_id="teams",
+        attributes={"id": team.id, "description": "new description"}
+    )
+    assert updated.id == team.id
+    assert updated.description == "new description"
+    assert updated.updated_at is not None
+    updated = await db_access.update_record(
+        table_id="teams",
+        attributes={"name": team.name, "description": "by name"}
+    )
+    assert updated.description == "by name"
+
+    # User names are not unique: falls back to select-then-mutate
+    assert not db_access._returning_fast_path("update", "users", None)
+    updated = await db_access.update_record(
+        table_id="users",
+        attributes={"name": user.name, "location": "Lisbon"}
+    )
+    assert updated.location == "Lisbon"
+
+    with pytest.raises(ValueError, match="not found"):
+        await db_access.update_record(
+            table_id="teams",
+            attributes={"name": "missing", "description": "nope"}
+        )
+
+    # DELETE ... RETURNING; the FK on the member is set to NULL by the database
+    await db_access.delete_record(table_id="teams", record_id=team.id)
+    with pytest.raises(ValueError, match="not found"):
+        await db_access.delete_record(table_id="teams", record_id=team.id)
+    assert await db_access.read_record(table_id="teams", record_id=team.id) is None
+    member = await db_access.read_record(table_id="users", record_id=user.id)
+    assert member.team_id is None
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_read_projected_columns(
+    db_create_tables,
+    db_close,
+    sample_users_data,
+    ):
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    for user in sample_users_data["valid_values"][:2]:
+        await db_access.create_record(
+            table_id="users",
+            attributes={key: value for key, value in user.items() if key != "team_name"}
+        )
+
+    columns = ("id", "name", "email")
+    users = await db_access.read_record(table_id="users", columns=columns)
+    assert [tuple(user._fields) for user in users] == [columns, columns]
+    assert [user.name for user in users] == ["alice", "bob"]
+
+    user = await db_access.read_record(table_id="users", record_id=users[0].id, columns=columns)
+    assert user._mapping == {"id": users[0].id, "name": "alice", "email": "alice@example.com"}
+
+    with pytest.raises(ValueError, match="no columns"):
+        await db_access.read_record(table_id="users", columns=("id", "password"))
+
+    # The same projection through QueryBuilder
+    async with db_access.query_records() as query:
+        model = query.table["users"]
+        rows = await query.select_columns("users", "name", "email").where(model.name == "bob").all()
+        assert [tuple(row) for row in rows] == [("bob", "bob@example.com")]
+        with pytest.raises(ValueError, match="no columns"):
+            query.select_columns("users", "password")
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_stream_records(
+    db_create_tables,
+    db_close,
+    ):
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    await db_access.create_records(
+        table_id="teams",
+        rows=[{"name": f"team{i}"} for i in range(7)]
+    )
+
+    batches = [
+        rows async for rows in db_access.stream_records(
+            table_id="teams", columns=("id", "name"), batch_size=3
+        )
+    ]
+    assert [len(rows) for rows in batches] == [3, 3, 1]
+    assert sorted(row.name for rows in batches for row in rows) == [f"team{i}" for i in range(7)]
+
+    with pytest.raises(ValueError):
+        db_access.stream_records(table_id="missing")
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_statement_cache(
+    db_create_tables,
+    db_close,
+    ):
+    from adapter.sql.statements import statements
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    await db_access.create_records(
+        table_id="teams",
+        rows=[{"name": f"team{i}"} for i in range(3)]
+    )
+    statements.clear()
+
+    teams = await db_access.read_record(table_id="teams", limit=2, order="asc")
+    page = await db_access.read_record(
+        table_id="teams", limit=2, order="asc", after=(teams[-1].name, teams[-1].id)
+    )
+    assert [team.name for team in page] == ["team2"]
+    for team in teams:
+        assert (await db_access.read_record(table_id="teams", record_id=team.id)).name == team.name
+    assert statements.stats() == {"size": 3, "hits": 1, "misses": 3}
+
+    # Same shape, new values: served from the registry
+    assert (await db_access.read_record(table_id="teams", limit=1, offset=1, order="asc"))[0].name == "team1"
+    await db_access.update_record(table_id="teams", attributes={"id": teams[0].id, "description": "first"})
+    await db_access.update_record(table_id="teams", attributes={"id": teams[1].id, "description": "second"})
+    assert (await db_access.read_record(table_id="teams", record_name="team1")).description == "second"
+    assert statements.stats() == {"size": 5, "hits": 3, "misses": 5}
+
+    # No order: ascending (name, id), the order="asc" statement
+    page = await db_access.read_record(table_id="teams", limit=2, after=(teams[0].name, teams[0].id))
+    assert [team.name for team in page] == ["team1", "team2"]
+    assert statements.stats() == {"size": 5, "hits": 4, "misses": 5}
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+async def query_plans(*calls, match: str) -> list[str]:
+    """SQLite EXPLAIN QUERY PLAN of the statements containing ``match`` run by ``calls``."""
+    from sqlalchemy import event
+
+    executed = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if match in statement:
+            executed.append((statement, parameters))
+
+    engine = DatabaseManager.get_engine()
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        for call in calls:
+            await call
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in executed:
+            rows = (await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)).all()
+            plans.append("\n".join(row[-1] for row in rows))
+    return plans
+
+
+@pytest.mark.asyncio
+async def test_db_read_bounded_relations(
+    db_create_tables,
+    db_close,
+    ):
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    teams = await db_access.create_records(
+        table_id="teams",
+        rows=[{"name": "big"}, {"name": "small"}, {"name": "empty"}]
+    )
+    big, small, empty = (team.id for team in teams)
+    await db_access.create_records(
+        table_id="users",
+        rows=[
+            *({"name": f"user{i}", "email": f"user{i}@example.com", "team_id": big} for i in range(5)),
+            {"name": "solo", "email": "solo@example.com", "team_id": small},
+        ]
+    )
+
+    page = await db_access.read_record(table_id="teams", order="asc", relations={"users": 2})
+    assert [team.name for team in page] == ["big", "empty", "small"]
+    assert [[user.name for user in team.users] for team in page] == [["user0", "user1"], [], ["solo"]]
+
+    page = await db_access.read_record(table_id="teams", order="asc", relations={"users": "count"})
+    assert [team.users_count for team in page] == [5, 0, 1]
+    assert [team.users for team in page] == [[], [], []]
+
+    team = await db_access.read_record(table_id="teams", record_id=big, relations={"manager": None, "users": 3})
+    assert len(team.users) == 3
+    team = await db_access.read_record(table_id="teams", record_id=empty, relations={})
+    assert team.users == [] and team.manager is None
+
+    # Both bounded queries seek members through the team_id index
+    plans = await query_plans(
+        db_access.read_record(table_id="teams", order="asc", relations={"users": 2}),
+        db_access.read_record(table_id="teams", order="asc", relations={"users": "count"}),
+        match="team_id IN",
+    )
+    assert len(plans) == 2
+    assert all("ix_user_team_id" in plan and "SCAN user" not in plan for plan in plans)
+
+    with pytest.raises(ValueError, match="no relationship"):
+        await db_access.read_record(table_id="teams", relations={"members": 1})
+    with pytest.raises(ValueError, match="not a collection"):
+        await db_access.read_record(table_id="teams", relations={"manager": "count"})
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_read_version(
+    db_create_tables,
+    db_close,
+    ):
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    team = await db_access.create_record(table_id="teams", attributes={"name": "versioned"})
+    before = await db_access.read_version(table_id="teams", record_id=team.id)
+    await db_access.create_record(
+        table_id="users", attributes={"name": "member", "email": "member@example.com", "team_id": team.id}
+    )
+    after = await db_access.read_version(table_id="teams", record_id=team.id)
+    assert (before.users_count, after.users_count) == (0, 1)
+    assert tuple(before) != tuple(after)
+
+    # Cheap validator: the member aggregates seek through the team_id index
+    [plan] = await query_plans(
+        db_access.read_version(table_id="teams", record_id=team.id), match="users_version"
+    )
+    assert "ix_user_team_id" in plan and "SCAN user" not in plan
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_search_records(
+    db_create_tables,
+    db_close,
+    ):
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    users = await db_access.create_records(
+        table_id="users",
+        rows=[
+            {"name": "alice", "email": "alice@example.com", "location": "Lisbon"},
+            {"name": "malik", "email": "malik@example.com"},
+            {"name": "bob", "email": "bob@alicorp.io"},
+            {"name": "carol", "email": "carol@example.com", "location": "Alicante"},
+        ]
+    )
+
+    found = await db_access.search_records(table_id="users", query="ALI", columns=("id", "name"))
+    assert sorted(row.name for row in found) == ["alice", "bob", "carol", "malik"]
+    assert [row.rank for row in found] == sorted(row.rank for row in found)
+
+    # Keyset pages over (rank, id) cover every match once
+    seen, after = [], None
+    while True:
+        page = await db_access.search_records(table_id="users", query="ali", limit=3, after=after)
+        seen.extend(row.id for row in page)
+        if len(page) < 3:
+            break
+        after = (page[-1].rank, page[-1].id)
+    assert sorted(seen) == sorted(row.id for row in found)
+
+    # The index follows updates and deletes
+    await db_access.update_record(table_id="users", attributes={"id": users[1].id, "name": "mark", "email": "mark@example.com"})
+    await db_access.delete_record(table_id="users", record_id=users[2].id)
+    found = await db_access.search_records(table_id="users", query="ali")
+    assert sorted(row.name for row in found) == ["alice", "carol"]
+    assert await db_access.search_records(table_id="users", query="100%") == []
+
+    with pytest.raises(ValueError, match="at least 3"):
+        await db_access.search_records(table_id="users", query="al")
+    with pytest.raises(ValueError, match="does not support search"):
+        await db_access.search_records(table_id="teams", query="eng")
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_count_records(
+    db_create_tables,
+    db_close,
+    ):
+    from sqlalchemy import text
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    teams = await db_access.create_records(table_id="teams", rows=[{"name": f"team{i}"} for i in range(4)])
+
+    # No statistics yet: the approximate count is the exact one
+    assert await db_access.count_records(table_id="teams") == 4
+    assert await db_access.count_records(table_id="teams", exact=True) == 4
+
+    # Cached until this repository creates or deletes a row
+    async with DatabaseManager.get_session() as db:
+        await db.exec(text("DELETE FROM team WHERE name = 'team3'"))
+        await db.commit()
+    assert await db_access.count_records(table_id="teams", exact=True) == 4
+    await db_access.delete_record(table_id="teams", record_id=teams[0].id)
+    assert await db_access.count_records(table_id="teams", exact=True) == 2
+    await db_access.create_record(table_id="teams", attributes={"name": "new"})
+    assert await db_access.count_records(table_id="teams", exact=True) == 3
+
+    # Approximate counts read the planner statistics, however stale
+    async with DatabaseManager.get_session() as db:
+        await db.exec(text("ANALYZE"))
+        await db.exec(text("INSERT INTO team (id, name, created_at) VALUES ('x', 'raw', CURRENT_TIMESTAMP)"))
+        await db.commit()
+    assert await db_access.count_records(table_id="teams") == 3
+    assert await db_access.count_records(table_id="users", exact=True) == 0
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_db_migrate_search_index(
+    db_create_tables,
+    db_close,
+    ):
+
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    await db_access.create_records(
+        table_id="users",
+        rows=[{"name": f"ali{i}", "email": f"ali{i}@example.com"} for i in range(4)]
+    )
+    # Schema of a database created before migrations.py: a rowid-keyed search index
+    downgrade = [
+        *(f"DROP TRIGGER user_search_{name}" for name in ("insert", "delete", "update")),
+        "DROP TABLE user_search",
+        "DROP INDEX ix_user_team_id",
+        "DROP INDEX ix_user_search_id",
+        'ALTER TABLE "user" DROP COLUMN search_id',
+        "CREATE VIRTUAL TABLE user_search USING fts5("
+        "name, email, location, content='user', content_rowid='rowid', tokenize='trigram')",
+        "INSERT INTO user_search(user_search) VALUES ('rebuild')",
+    ]
+    async with DatabaseManager.get_engine().begin() as conn:
+        for statement in downgrade:
+            await conn.exec_driver_sql(statement)
+
+    await DatabaseManager.migrate()
+    await DatabaseManager.migrate()  # idempotent
+    async with DatabaseManager.get_engine().connect() as conn:
+        keys = (await conn.exec_driver_sql('SELECT search_id FROM "user"')).scalars().all()
+        indexes = (await conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars().all()
+        fts = (await conn.exec_driver_sql("SELECT sql FROM sqlite_master WHERE name = 'user_search'")).scalar()
+    assert None not in keys and len(set(keys)) == 4
+    assert "ix_user_team_id" in indexes
+    assert "content_rowid='search_id'" in fts
+    assert len(await db_access.search_records(table_id="users", query="ali")) == 4
+
+    # Rows written after the migration are indexed under a new key, across VACUUM
+    created = await db_access.create_records(
+        table_id="users", rows=[{"name": "malik", "email": "malik@example.com"}]
+    )
+    await db_access.delete_record(table_id="users", record_name="ali0")
+    async with DatabaseManager.get_engine().connect() as conn:
+        await (await conn.execution_options(isolation_level="AUTOCOMMIT")).exec_driver_sql("VACUUM")
+    found = await db_access.search_records(table_id="users", query="ali", columns=("id", "name"))
+    assert sorted(row.name for row in found) == ["ali1", "ali2", "ali3", "malik"]
+    assert created[0].id in [row.id for row in found]
+
+    await db_close()
+
+    assert not path.exists("test.db")
@@ -63,3 +63,150 @@ async def test_db_session(
     await db_close()
 
     assert not path.exists("test.db")
+
+
+@mark.asyncio
+async def test_db_read_replica_routing(
+    db_create_tables,
+    db_close,
+    sample_teams_data,
+    ):
+    from os import remove
+    from config.settings import settings
+    from adapter.sql.data_access import DbAccessImpl
+    from adapter.sql.data_base import DatabaseManager
+
+    # Two SQLite files without replication: reads served by the replica miss primary writes
+    settings.DATABASE_REPLICA_URLS = "sqlite+aiosqlite:///test_replica.db"
+    DatabaseManager.reset_engine()
+    try:
+        await db_create_tables()
+        db_access = DbAccessImpl(db_manager=DatabaseManager)
+        assert DatabaseManager.get_read_engine() is not DatabaseManager.get_engine()
+
+        team = await db_access.create_record(
+            table_id="teams",
+            attributes=sample_teams_data["valid_values"][0]
+        )
+        assert await db_access.read_record(table_id="teams", record_id=team.id) is None
+
+        async with db_access.unit_of_work():
+            assert await db_access.read_record(table_id="teams", record_id=team.id) is None
+            await db_access.create_record(
+                table_id="teams",
+                attributes=sample_teams_data["valid_values"][1]
+            )
+            # Read-your-writes: after a write the rest of the unit of work uses the primary
+            record = await db_access.read_record(table_id="teams", record_id=team.id)
+            assert record.name == team.name
+    finally:
+        await db_close()
+        settings.DATABASE_REPLICA_URLS = ""
+        if path.exists("test_replica.db"):
+            remove("test_replica.db")
+
+    assert not path.exists("test.db")
+
+
+@mark.asyncio
+async def test_db_pool_metrics(
+    metric_reader,
+    db_tables,
+    db_create_tables,
+    db_close,
+    sample_one_team
+    ):
+    from adapter.sql.data_base import DatabaseManager
+
+    def collect() -> dict:
+        points = {}
+        for resource_metrics in metric_reader.get_metrics_data().resource_metrics:
+            for scope_metrics in resource_metrics.scope_metrics:
+                for metric in scope_metrics.metrics:
+                    points[metric.name] = list(metric.data.data_points)
+        return points
+
+    def recycles(points: dict) -> int:
+        return sum(
+            point.value for point in points.get("db.client.connection.recycles", [])
+            if point.attributes["db.client.connection.pool.name"] == "primary"
+        )
+
+    DatabaseManager.reset_engine()
+    await db_create_tables()
+    async with DatabaseManager.get_session() as db:
+        db.add(db_tables["teams"](**sample_one_team))
+        await db.commit()
+        # The new transaction holds a connection while metrics are collected
+        await db.exec(select(db_tables["teams"]))
+
+        points = collect()
+        connections = {
+            point.attributes["db.client.connection.state"]: point.value
+            for point in points["db.client.connection.count"]
+            if point.attributes["db.client.connection.pool.name"] == "primary"
+        }
+        assert connections["used"] == 1
+        assert "idle" in connections
+        assert "db.client.connection.overflow" in points
+        assert sum(point.count for point in points["db.client.connection.wait_time"]) >= 1
+        assert sum(point.count for point in points["db.client.connection.create_time"]) >= 1
+
+    # An invalidated connection is replaced when its record is checked out again
+    recycled = recycles(points)
+    engine = DatabaseManager.get_engine()
+    async with engine.connect() as conn:
+        await conn.invalidate()
+    async with engine.connect() as conn:
+        await conn.exec_driver_sql("SELECT 1")
+    assert recycles(collect()) == recycled + 1
+
+    await db_close()
+
+
+@mark.asyncio
+async def test_db_tuned_sqlite_profile(
+    db_create_tables,
+    db_close,
+    ):
+    import asyncio
+    from sqlalchemy import text
+    from config.settings import settings
+    from adapter.sql.data_access import DbAccessImpl
+    from adapter.sql.data_base import DatabaseManager
+
+    settings.SQLITE_TUNED_PROFILE = True
+    DatabaseManager.reset_engine()
+    try:
+        await db_create_tables()
+        writer = DatabaseManager.get_engine()
+        reader = DatabaseManager.get_read_engine()
+        assert reader is not writer
+        assert writer.pool.size() == 1
+
+        async with writer.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1  # NORMAL
+        async with reader.connect() as conn:
+            assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 1
+
+        # Concurrent writers queue for the single writer connection instead of failing
+        db_access = DbAccessImpl(db_manager=DatabaseManager)
+        await asyncio.gather(*(
+            db_access.create_record(table_id="teams", attributes={"name": f"team{i}"})
+            for i in range(20)
+        ))
+        teams = await db_access.read_record(table_id="teams", limit=50)
+        assert len(teams) == 20
+
+        # A unit of work gives its reader connection back once it writes
+        async with db_access.unit_of_work():
+            await db_access.read_record(table_id="teams", limit=1)
+            assert reader.pool.checkedout() == 1
+            await db_access.create_record(table_id="teams", attributes={"name": "team20"})
+            assert reader.pool.checkedout() == 0
+    finally:
+        await db_close()
+        settings.SQLITE_TUNED_PROFILE = False
+
+    assert not path.exists("test.db")
@@ -0,0 +1,146 @@
+from os import path
+from unittest.mock import patch
+
+import pytest
+
+from adapter.sql.cache import CachedDbAccess, LruTtlCache
+from adapter.sql.data_access import DbAccessImpl
+from adapter.sql.data_base import DatabaseManager
+
+
+def test_lru_ttl_cache_evicts_and_expires():
+    cache = LruTtlCache(max_entries=2, ttl_seconds=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" becomes least recently used
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+    with patch("adapter.sql.cache.monotonic", return_value=10**9):
+        assert cache.get("a") is None
+    assert cache.stats() == {"size": 1, "hits": 2, "misses": 2, "evictions": 1, "expirations": 1}
+
+
+@pytest.mark.asyncio
+async def test_cached_db_access(
+    db_create_tables,
+    db_close,
+    sample_teams_data,
+    sample_users_data,
+    ):
+    await db_create_tables()
+    repository = DbAccessImpl(db_manager=DatabaseManager)
+    db_access = CachedDbAccess(repository=repository, max_entries=100, ttl_seconds=60)
+
+    team = await db_access.create_record(
+        table_id="teams",
+        attributes=sample_teams_data["valid_values"][0]
+    )
+    by_name = await db_access.read_record(table_id="teams", record_name=team.name)
+    by_id = await db_access.read_record(table_id="teams", record_id=team.id)
+    assert by_name is by_id
+    assert by_id.users == []
+    assert db_access.stats()["hits"] == 1
+    assert db_access.stats()["misses"] == 1
+
+    # A new member invalidates the cached team embedding the member list
+    await db_access.create_record(
+        table_id="users",
+        attributes={**sample_users_data["valid_values"][0], "team_id": team.id}
+    )
+    by_id = await db_access.read_record(table_id="teams", record_id=team.id)
+    assert len(by_id.users) == 1
+    assert db_access.stats()["invalidations"] == 1
+
+    updated = await db_access.update_record(
+        table_id="teams",
+        attributes={"id": team.id, "description": "changed"}
+    )
+    assert updated.description == "changed"
+    by_name = await db_access.read_record(table_id="teams", record_name=team.name)
+    assert by_name.description == "changed"
+
+    await db_access.delete_record(table_id="teams", record_name=team.name)
+    assert await db_access.read_record(table_id="teams", record_id=team.id) is None
+
+    await db_close()
+
+    assert not path.exists("test.db")
+
+
+@pytest.mark.asyncio
+async def test_cached_db_access_invalidates_after_commit(
+    db_create_tables,
+    db_close,
+    sample_teams_data,
+    ):
+    import asyncio
+    from contextvars import Context
+
+    await db_create_tables()
+    repository = DbAccessImpl(db_manager=DatabaseManager)
+    db_access = CachedDbAccess(repository=repository, max_entries=100, ttl_seconds=60)
+    team = await db_access.create_record(
+        table_id="teams",
+        attributes=sample_teams_data["valid_values"][0]
+    )
+    assert await repository.count_records(table_id="teams", exact=True) == 1
+
+    async with db_access.unit_of_work():
+        await db_access.update_record(
+            table_id="teams",
+            attributes={"id": team.id, "description": "changed"}
+        )
+        await db_access.create_record(table_id="teams", attributes={"name": "second"})
+        # A concurrent request (outside the unit of work) caches the old committed state
+        concurrent = asyncio.create_task(
+            db_access.read_record(table_id="teams", record_id=team.id), context=Context()
+        )
+        assert (await concurrent).description != "changed"
+        counted = asyncio.create_task(
+            repository.count_records(table_id="teams", exact=True), context=Context()
+        )
+        assert await counted == 1
+
+    # Dropped again once the unit of work committed
+    cached = await db_access.read_record(table_id="teams", record_id=team.id)
+    assert cached.description == "changed"
+    assert await repository.count_records(table_id="teams", exact=True) == 2
+
+    await db_close()
+
+
+@pytest.mark.asyncio
+async def test_cached_db_access_skips_rolled_back_reads(
+    db_create_tables,
+    db_close,
+    sample_teams_data,
+    ):
+    await db_create_tables()
+    db_access = CachedDbAccess(repository=DbAccessImpl(db_manager=DatabaseManager), max_entries=100, ttl_seconds=60)
+    team = await db_access.create_record(
+        table_id="teams",
+        attributes=sample_teams_data["valid_values"][0]
+    )
+
+    with pytest.raises(RuntimeError):
+        async with db_access.unit_of_work():
+            await db_access.update_record(
+                table_id="teams",
+                attributes={"id": team.id, "description": "rolled back"}
+            )
+            # Reads its own uncommitted write, without caching it
+            read = await db_access.read_record(table_id="teams", record_id=team.id)
+            assert read.description == "rolled back"
+            found = await db_access.lookup_record(table_id="teams", field="name", value=team.name)
+            assert found.description == "rolled back"
+            raise RuntimeError("rollback")
+
+    assert (await db_access.read_record(table_id="teams", record_id=team.id)).description != "rolled back"
+    assert (await db_access.lookup_record(table_id="teams", field="name", value=team.name)).description != "rolled back"
+
+    await db_close()
+
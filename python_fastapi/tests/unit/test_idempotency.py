@@ -0,0 +1,46 @@
+import pytest
+
+from adapter.rest.idempotency import IdempotencyStore, StoredResponse
+from adapter.sql.data_access import DbAccessImpl
+from adapter.sql.data_base import DatabaseManager
+
+
+@pytest.mark.asyncio
+async def test_idempotency_store_durable(db_create_tables, db_close):
+    await db_create_tables()
+    db_access = DbAccessImpl(db_manager=DatabaseManager)
+    store = IdempotencyStore(repository=db_access)
+    stored = StoredResponse("fingerprint", 201, b'{"record_name":"support"}')
+
+    # The request's writes roll back: neither the key nor the response is kept
+    assert await store.begin("POST /teams", "k1", "fingerprint") is None
+    with pytest.raises(ValueError):
+        async with db_access.unit_of_work():
+            await store.save("POST /teams", "k1", stored)
+            await db_access.create_record(table_id="teams", attributes={"name": "support"})
+            await db_access.create_record(table_id="teams", attributes={"name": "support"})
+    store.finish("POST /teams", "k1", None)
+    assert await db_access.read_record(table_id="idempotency_keys", record_name="POST /teams k1") is None
+
+    # Committed with the request's writes
+    assert await store.begin("POST /teams", "k1", "fingerprint") is None
+    async with db_access.unit_of_work():
+        await store.save("POST /teams", "k1", stored)
+        await db_access.create_record(table_id="teams", attributes={"name": "support"})
+    store.finish("POST /teams", "k1", stored)
+
+    # A fresh store (restart, another worker) replays from the table
+    store = IdempotencyStore(repository=db_access)
+    replay = await store.begin("POST /teams", "k1", "fingerprint")
+    assert (replay.status_code, replay.body) == (201, stored.body)
+    with pytest.raises(ValueError):
+        await store.begin("POST /teams", "k1", "other")
+    assert store.stats()["replays"] == 1
+
+    # Expired keys are freed
+    store = IdempotencyStore(repository=db_access, ttl_seconds=0)
+    assert await store.begin("POST /teams", "k1", "other") is None
+    store.finish("POST /teams", "k1", None)
+    assert await db_access.read_record(table_id="idempotency_keys", record_name="POST /teams k1") is None
+
+    await db_close()
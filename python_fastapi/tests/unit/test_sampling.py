@@ -0,0 +1,47 @@
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind, StatusCode
+
+from config.sampling import ErrorSpanProcessor, build_sampler
+from config.settings import settings
+
+
+def test_route_sampling_rules_and_reload():
+    config = settings.model_copy()
+    config.TRACE_SAMPLE_RATIO = 1.0
+    config.TRACE_SAMPLE_RULES = "GET /users=0"
+    config.TRACE_SAMPLE_ERRORS = True
+    exporter = InMemorySpanExporter()
+    processor = SimpleSpanProcessor(exporter)
+    provider = TracerProvider(sampler=build_sampler(config))
+    provider.add_span_processor(processor)
+    provider.add_span_processor(ErrorSpanProcessor(processor))
+    tracer = provider.get_tracer("test")
+
+    def request(method: str, route: str, status: StatusCode = StatusCode.UNSET):
+        attributes = {"http.method": method, "http.route": route}
+        with tracer.start_as_current_span(f"{method} {route}", kind=SpanKind.SERVER, attributes=attributes) as span:
+            with tracer.start_as_current_span("SELECT"):
+                pass
+            span.set_status(status)
+        names = [span.name for span in exporter.get_finished_spans()]
+        exporter.clear()
+        return names
+
+    assert request("GET", "/users") == []
+    assert request("POST", "/users") == ["SELECT", "POST /users"]
+    assert request("GET", "/teams") == ["SELECT", "GET /teams"]
+    # An unsampled failing request keeps its server span, not its children
+    assert request("GET", "/users", StatusCode.ERROR) == ["GET /users"]
+    config.TRACE_SAMPLE_ERRORS = False
+    assert request("GET", "/users", StatusCode.ERROR) == []
+
+    # New settings apply to the next trace
+    config.TRACE_SAMPLE_RULES = "GET /users=1,GET *=0"
+    assert request("GET", "/users") == ["SELECT", "GET /users"]
+    assert request("GET", "/teams") == []
+    with pytest.raises(ValueError):
+        config.TRACE_SAMPLE_RULES = "GET /users=2"
+    assert request("GET", "/users") == ["SELECT", "GET /users"]
@@ -0,0 +1,33 @@
+import sys
+import subprocess
+from os import path
+
+import pytest
+
+from config.settings import settings
+
+
+def test_server_import_is_lazy():
+    # Telemetry SDK, exporters, instrumentations and the data layer load when
+    # a worker starts (lifespan), not when the app module is imported
+    heavy = (
+        "opentelemetry.sdk", "opentelemetry.exporter", "opentelemetry.instrumentation",
+        "sqlalchemy", "sqlmodel", "adapter.sql.data_access", "adapter.sql.models",
+    )
+    src = path.join(path.dirname(path.dirname(path.dirname(path.abspath(__file__)))), "src")
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, adapter.rest.server; print('\\n'.join(sys.modules))"],
+        cwd=src, capture_output=True, text=True, check=True,
+    )
+    loaded = [module for module in result.stdout.split() if module.startswith(heavy)]
+    assert loaded == []
+
+
+def test_telemetry_endpoint_required_outside_development():
+    # Empty disables telemetry in development and test only
+    config = settings.model_copy()
+    config.ENVIRONMENT = "development"
+    config.OTEL_EXPORTER_OTLP_ENDPOINT = ""
+    config.ENVIRONMENT = "test"
+    with pytest.raises(ValueError):
+        config.ENVIRONMENT = "production"